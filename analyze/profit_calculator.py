@@ -1,7 +1,12 @@
 
 import os
+import sys
+sys.path.append("../")
+
+import trader.log_reader
 
 bot_config_pairs = [
+    ('Signal spot bot', 'log_signal_spot_bot.txt'),
     ('Primitive spot bot', 'log_primitive_spot_bot.txt')
 ]
 
@@ -14,18 +19,21 @@ LOG_FILE = bot_config_pairs[int(input('Select the config: '))][1]
 
 # Read the log file
 log_file_exact_path = os.path.join(os.path.dirname(os.getcwd()), LOG_FILE)
-with open(log_file_exact_path) as log_file:
-    lines = log_file.readlines()
+entries = trader.log_reader.read_entries(log_file_exact_path)
 
 # ex -> BTCUSTD: {trades: ... , final_profit: ..., bought_count: ..., sold_count: ...}
 profit_dict = {}
 
-for line in lines:
-    words = line.split(' ')
-    if 'Bought' in words:
-        symbol = words[5] + words[8]
-        target_amount = float(words[7])
+for (date, message) in entries:
+    trade = trader.log_reader.parse_trade(message)
+    if trade is None:
+        continue
+
+    line = f'{date} --- {message}'
+    symbol = trade['symbol']
+    target_amount = trade['quote_quantity']
 
+    if trade['side'] == 'BUY':
         if symbol in profit_dict:
             profit_dict[symbol]['trades'].append(line)
             profit_dict[symbol]['final_profit'] -= target_amount
@@ -37,10 +45,7 @@ for line in lines:
                 'bought_count': 1,
                 'sold_count': 0
             }
-    elif 'Sold' in words:
-        symbol = words[5] + words[8]
-        target_amount = float(words[7])
-
+    else:
         if symbol in profit_dict:
             profit_dict[symbol]['trades'].append(line)
             profit_dict[symbol]['final_profit'] += target_amount
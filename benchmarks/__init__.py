@@ -0,0 +1,7 @@
+"""
+    Benchmarks of the indicators, the order preparation and the bot cycle;
+
+        python3 -m benchmarks run --output baseline.json
+        python3 -m benchmarks run --output current.json
+        python3 -m benchmarks compare baseline.json current.json
+"""
@@ -0,0 +1,74 @@
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+import numpy
+
+import benchmarks.bot_cycle
+import benchmarks.compare
+import benchmarks.micro
+
+SUITES = ['micro', 'cycle', 'scaling']
+
+
+def get_metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'date': datetime.datetime.now().isoformat(timespec = 'seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+    }
+
+
+def run(args):
+    results = []
+    for suite in args.suites:
+        print(f'Running the {suite} benchmarks...', flush = True)
+        if suite == 'micro':
+            results += benchmarks.micro.run()
+        elif suite == 'cycle':
+            results += benchmarks.bot_cycle.run(args.symbols, args.workers, args.latency)
+        elif suite == 'scaling':
+            results += benchmarks.bot_cycle.run_scaling(args.symbol_counts, args.workers, args.latency)
+
+    with open(args.output, 'w') as output_file:
+        json.dump({'metadata': get_metadata(), 'results': results}, output_file, indent = 2)
+
+    for result in results:
+        print(f"{benchmarks.compare.result_key(result)}: {benchmarks.compare.format_seconds(result['median'])}")
+    print(f'\nWrote {len(results)} results to {args.output}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog = 'python3 -m benchmarks', description = 'Benchmarks of the indicators, the order preparation and the bot cycle')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    run_parser = commands.add_parser('run', help = 'Run the benchmarks and write the results as JSON.')
+    run_parser.add_argument('-s', '--suites', nargs = '+', choices = SUITES, default = SUITES)
+    run_parser.add_argument('-o', '--output', default = 'benchmark_results.json')
+    run_parser.add_argument('-n', '--symbols', type = int, default = 20, help = 'Number of symbols of the cycle benchmark.')
+    run_parser.add_argument('-c', '--symbol-counts', type = int, nargs = '+', default = benchmarks.bot_cycle.SYMBOL_COUNTS, help = 'Numbers of symbols of the scaling benchmark.')
+    run_parser.add_argument('-w', '--workers', type = int, default = benchmarks.bot_cycle.signal_spot_bot.DEFAULT_WORKER_COUNT)
+    run_parser.add_argument('-l', '--latency', type = float, default = 0.0, help = 'Seconds the stand-in exchange delays every response by.')
+
+    compare_parser = commands.add_parser('compare', help = 'Flag the results that are slower than the baseline.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('-t', '--threshold', type = float, default = benchmarks.compare.DEFAULT_THRESHOLD, help = 'Slowdown ratio that is a regression, e.g. 0.1 for 10%%.')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    elif not benchmarks.compare.run(args.baseline, args.current, args.threshold):
+        sys.exit(1)
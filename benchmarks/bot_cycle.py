@@ -0,0 +1,148 @@
+"""
+    Macro benchmarks of the signal spot bot cycle.
+
+    A cycle is what the main loop of signal_spot_bot.py does between two
+    sleeps; refresh the prices, then perform_bot_operations for every config
+    on the worker pool. The exchange is the local stand-in, so the results
+    only depend on this machine and the configured latency.
+"""
+import concurrent.futures
+import contextlib
+import os
+import tempfile
+
+import experimental.exchange_stand_in
+import signal_spot_bot
+import trader.binance.client
+import trader.binance.filters
+import trader.binance.klines
+import trader.binance.market
+import trader.constants
+import trader.ssb.constants
+import trader.ssb.state_store
+import trader.ssb.triggers
+from benchmarks.timing import measure_once
+from tui.ssb_interface import TUI
+
+SYMBOL_COUNTS = [1, 10, 50, 100, 250, 500]
+
+# Cycles measured after the first one warmed up the kline windows
+WARM_CYCLE_COUNT = 5
+
+
+def get_configs(prefix, count) -> list:
+    return [
+        {
+            'enabled': True,
+            'base_currency': f'{prefix}{index}',
+            'target_currency': 'USDT',
+            'buy_on_next_trade': True,
+            'trade_amount_buy': 15.0,
+            'trade_wealth_percent_sell': 100.0,
+            'last_operation_price': -1.0,
+            'prevent_loss': True,
+        }
+        for index in range(count)
+    ]
+
+
+@contextlib.contextmanager
+def stand_in_exchange(latency = 0.0, workers = signal_spot_bot.DEFAULT_WORKER_COUNT, balance = 1e9):
+    """
+        Point the trader.binance modules at a stand-in exchange served in the
+        background, the bot writes its state and logs into a temporary directory
+    """
+    exchange = experimental.exchange_stand_in.Exchange(balances = {'USDT': balance}, weight_limit = 10 ** 9)
+    server = experimental.exchange_stand_in.start_in_background(exchange, latency = latency)
+    previous_endpoint = trader.constants.BASE_ENDPOINT
+    previous_client = trader.binance.client.default_client
+    previous_directory = os.getcwd()
+    previous_state_store = signal_spot_bot.state_store
+
+    with tempfile.TemporaryDirectory() as directory:
+        trader.constants.BASE_ENDPOINT = f'http://localhost:{server.server_port}'
+        trader.binance.client.default_client = trader.binance.client.BinanceClient(pool_size = max(workers, trader.binance.client.DEFAULT_POOL_SIZE))
+        os.chdir(directory)
+        signal_spot_bot.state_store = trader.ssb.state_store.StateStore(trader.ssb.constants.STATE_FILE)
+        try:
+            yield exchange
+        finally:
+            signal_spot_bot.state_store.close()
+            signal_spot_bot.state_store = previous_state_store
+            os.chdir(previous_directory)
+            trader.binance.client.default_client = previous_client
+            trader.constants.BASE_ENDPOINT = previous_endpoint
+            server.shutdown()
+            server.server_close()
+
+
+def _reset(configs):
+    """ Start from empty caches, like a freshly started bot """
+    trader.binance.klines.clear()
+    trader.ssb.triggers.trigger_index.clear()
+    trader.binance.market.market_snapshot = trader.binance.market.MarketSnapshot()
+    trader.binance.market.market_snapshot.track([config['base_currency'] + config['target_currency'] for config in configs])
+
+    signal_spot_bot.master_config_files.clear()
+    signal_spot_bot.master_config_files.extend(configs)
+    for config in configs:
+        symbol = config['base_currency'] + config['target_currency']
+        config['last_operation_price'] = trader.binance.market.market_snapshot.get_price(symbol)
+
+    # The stand-in lists the symbols on their first request
+    trader.binance.filters.symbol_filters.load()
+
+
+def run_cycle(executor, tui):
+    """ The body of the main loop of signal_spot_bot.py """
+    trader.binance.market.market_snapshot.refresh_prices()
+
+    futures = [
+        executor.submit(perform, config, tui)
+        for config in signal_spot_bot.master_config_files
+        if config['enabled']
+    ]
+    for future in concurrent.futures.as_completed(futures):
+        future.result()
+
+
+def perform(config, tui):
+    signal_spot_bot.perform_bot_operations(config, 'benchmark-api-key', 'benchmark-secret-key', tui)
+
+
+def measure_cycles(prefix, symbol_count, workers, warm_cycle_count) -> list:
+    """ Results of the first (cold) cycle and the following (warm) cycles """
+    configs = get_configs(prefix, symbol_count)
+    _reset(configs)
+    tui = TUI()
+    params = {'symbols': symbol_count, 'workers': workers}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+        cold = measure_once('bot.cycle.cold', dict(params), lambda: run_cycle(executor, tui), repeat = 1)
+        warm = measure_once('bot.cycle.warm', dict(params), lambda: run_cycle(executor, tui), repeat = warm_cycle_count)
+
+    return [cold, warm]
+
+
+def run(symbol_count = 20, workers = signal_spot_bot.DEFAULT_WORKER_COUNT, latency = 0.0, warm_cycle_count = WARM_CYCLE_COUNT) -> list:
+    """ A single cycle of <symbol_count> symbols """
+    with stand_in_exchange(latency, workers):
+        results = measure_cycles('CYCLE', symbol_count, workers, warm_cycle_count)
+
+    for result in results:
+        result['params']['latency'] = latency
+    return results
+
+
+def run_scaling(symbol_counts = SYMBOL_COUNTS, workers = signal_spot_bot.DEFAULT_WORKER_COUNT, latency = 0.0, warm_cycle_count = WARM_CYCLE_COUNT) -> list:
+    """ Cycle time as the number of symbols grows, every count trades its own symbols """
+    results = []
+    with stand_in_exchange(latency, workers):
+        for symbol_count in symbol_counts:
+            for result in measure_cycles(f'SCALE{symbol_count}X', symbol_count, workers, warm_cycle_count):
+                result['name'] = result['name'].replace('bot.cycle', 'bot.scaling')
+                result['params']['latency'] = latency
+                # Seconds per symbol shows whether the cycle scales linearly
+                result['per_symbol'] = result['median'] / symbol_count
+                results.append(result)
+    return results
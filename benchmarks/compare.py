@@ -0,0 +1,63 @@
+"""
+    Compare benchmark results against a baseline
+"""
+import json
+
+# A result is a regression if its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.10
+
+
+def result_key(result) -> str:
+    params = ','.join(f'{key}={value}' for (key, value) in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]"
+
+
+def load_results(path) -> dict:
+    with open(path, 'r') as results_file:
+        return {result_key(result): result for result in json.load(results_file)['results']}
+
+
+def compare(baseline, current, threshold = DEFAULT_THRESHOLD) -> list:
+    """
+        Returns [(key, baseline median, current median, change ratio, is_regression)]
+        of the results found in both, <baseline> and <current> are load_results dicts
+    """
+    rows = []
+    for (key, result) in current.items():
+        if key not in baseline:
+            continue
+
+        baseline_median = baseline[key]['median']
+        change = result['median'] / baseline_median - 1 if baseline_median > 0 else 0.0
+        rows.append((key, baseline_median, result['median'], change, change > threshold))
+    return rows
+
+
+def format_seconds(seconds) -> str:
+    for (unit, scale) in [('s', 1), ('ms', 1e-3), ('us', 1e-6)]:
+        if seconds >= scale:
+            return f'{seconds / scale:.3f}{unit}'
+    return f'{seconds / 1e-9:.1f}ns'
+
+
+def print_comparison(rows, missing_keys):
+    width = max([len(row[0]) for row in rows] + [10])
+    for (key, baseline_median, current_median, change, is_regression) in rows:
+        flag = 'REGRESSION' if is_regression else ''
+        print(f'{key:<{width}}  {format_seconds(baseline_median):>11}  {format_seconds(current_median):>11}  {100 * change:+8.2f}%  {flag}')
+
+    for key in missing_keys:
+        print(f'{key:<{width}}  is not in the current results')
+
+
+def run(baseline_path, current_path, threshold = DEFAULT_THRESHOLD) -> bool:
+    """ Print the comparison, returns True if nothing regressed """
+    baseline = load_results(baseline_path)
+    current = load_results(current_path)
+    rows = compare(baseline, current, threshold)
+
+    print_comparison(rows, sorted(set(baseline) - set(current)))
+
+    regressions = [row for row in rows if row[4]]
+    print(f'\n{len(regressions)} of {len(rows)} benchmarks regressed by more than {100 * threshold:.0f}%')
+    return len(regressions) == 0
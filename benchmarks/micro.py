@@ -0,0 +1,61 @@
+"""
+    Micro benchmarks of the indicators and the order quantity normalization
+"""
+import random
+
+import trader.binance.filters
+import trader.binance.helper
+import trader.indicators
+from benchmarks.timing import measure
+
+WINDOW_SIZES = [9, 14, 20, 50, 100, 200, 1000]
+
+# Step sizes of the LOT_SIZE filters the quantities are normalized with
+STEP_SIZES = ['1.00000000', '0.00100000', '0.00000100']
+
+
+def get_closes(count, seed = 0) -> list:
+    """ Random walk of <count> prices, the same for the same <seed> """
+    rng = random.Random(seed)
+    closes = [100.0]
+    for _ in range(count - 1):
+        closes.append(closes[-1] * (1 + rng.gauss(0, 0.01)))
+    return closes
+
+
+def _symbol_info(symbol, step_size) -> dict:
+    return {
+        'symbol': symbol,
+        'quoteAssetPrecision': 8,
+        'filters': [
+            {'filterType': 'LOT_SIZE', 'minQty': step_size, 'maxQty': '9000000.00000000', 'stepSize': step_size},
+            {'filterType': 'PRICE_FILTER', 'minPrice': '0.01000000', 'maxPrice': '1000000.00000000', 'tickSize': '0.01000000'},
+        ],
+    }
+
+
+def run(window_sizes = WINDOW_SIZES, repeat = None) -> list:
+    kwargs = {} if repeat is None else {'repeat': repeat}
+    results = []
+
+    for window_size in window_sizes:
+        closes = get_closes(window_size + 1)
+        params = {'window': window_size}
+        results.append(measure('indicators.get_rsi', params, lambda: trader.indicators.get_rsi(closes), **kwargs))
+        results.append(measure('indicators.get_bollinger_bands', params, lambda: trader.indicators.get_bollinger_bands(closes), **kwargs))
+        results.append(measure('indicators.get_sma', params, lambda: trader.indicators.get_sma(closes), **kwargs))
+        results.append(measure('indicators.get_ema', params, lambda: trader.indicators.get_ema(closes), **kwargs))
+
+    # The filters are served from the index, no exchange info is downloaded
+    symbols = {step_size: f'STEP{index}USDT' for (index, step_size) in enumerate(STEP_SIZES)}
+    trader.binance.filters.symbol_filters.update([_symbol_info(symbol, step_size) for (step_size, symbol) in symbols.items()])
+
+    for (step_size, symbol) in symbols.items():
+        results.append(measure(
+            'helper.update_quantity_according_lot_size_filter',
+            {'step_size': step_size},
+            lambda: trader.binance.helper.update_quantity_according_lot_size_filter(symbol, 0.123456789123),
+            **kwargs,
+        ))
+
+    return results
@@ -0,0 +1,45 @@
+"""
+    Timing helpers shared by the benchmarks
+"""
+import statistics
+import time
+import timeit
+
+# Number of timed rounds of every micro benchmark
+DEFAULT_REPEAT = 7
+
+
+def summarize(name, params, times, unit = 's') -> dict:
+    """ Result entry of <times>, the seconds a single call took in every round """
+    return {
+        'name': name,
+        'params': params,
+        'unit': unit,
+        'rounds': len(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'min': min(times),
+        'max': max(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def measure(name, params, function, repeat = DEFAULT_REPEAT) -> dict:
+    """
+        Time <function>, every round calls it enough times to take at least
+        0.2 seconds like timeit does, so the fast calls are measured precisely
+    """
+    timer = timeit.Timer(function)
+    (number, _) = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat, number)]
+    return summarize(name, params, times)
+
+
+def measure_once(name, params, function, repeat = DEFAULT_REPEAT) -> dict:
+    """ Time <repeat> single calls of <function>, for the slow calls with side effects """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return summarize(name, params, times)
@@ -0,0 +1,43 @@
+import sys
+import time
+sys.path.append("../")
+# pylint: disable=import-error
+import trader.binance.candle_store
+import trader.ssb.backtest
+
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+# Candles are read from the local store, only the missing ones are downloaded
+candle_store = trader.binance.candle_store.CandleStore('../candles')
+
+
+def get_klines_arrays(symbol, interval, days = 365):
+    """ Returns (open_times, closes) arrays of the last <days> days """
+    start_time = int(time.time() * 1000) - days * DAY_MILLISECONDS
+    candle_store.sync(symbol, interval, start_time)
+    candles = candle_store.read(symbol, interval, start_time)
+    return (candles['open_time'], candles['close'])
+
+
+def backtest(symbol, interval):
+    (open_times, prices) = get_klines_arrays(symbol, interval)
+    indicators = trader.ssb.backtest.get_indicator_arrays(
+        open_times,
+        prices,
+        get_klines_arrays(symbol, '4h', 400),
+        get_klines_arrays(symbol, '1d', 400),
+    )
+
+    for prevent_loss in [True, False]:
+        result = trader.ssb.backtest.run_backtest(prices, indicators, prevent_loss = prevent_loss)
+        print(f'{symbol} {interval} prevent_loss:{prevent_loss} / '
+            f'profit:{result.profit_percent:.2f}% - max drawdown:{result.max_drawdown_percent:.2f}% - '
+            f'buy:{result.buy_count} - sell:{result.sell_count}')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Please provide at least 1 argument; SYMBOL [INTERVAL]")
+        exit()
+
+    backtest(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else '15m')
@@ -0,0 +1,41 @@
+import argparse
+import sys
+import time
+sys.path.append("../")
+# pylint: disable=import-error
+import trader.binance.candle_store
+import trader.binance.client
+import trader.binance.downloader
+import trader.binance.rate_limit
+
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+
+def print_progress(symbol, interval, done, total):
+    print(f'\r{symbol} {interval}: {done}/{total} pages', end = '\n' if done == total else '', flush = True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = 'Download historical klines into the candle store')
+    parser.add_argument('symbols', nargs = '+')
+    parser.add_argument('-i', '--intervals', nargs = '+', default = ['1m'])
+    parser.add_argument('-d', '--days', type = int, default = 365)
+    parser.add_argument('-w', '--workers', type = int, default = trader.binance.downloader.DEFAULT_WORKER_COUNT)
+    parser.add_argument('-l', '--weight-limit', type = int, default = trader.binance.rate_limit.REQUEST_WEIGHT_LIMIT)
+    args = parser.parse_args()
+
+    # Every request of the download shares the weight limit of the client
+    trader.binance.client.default_client.scheduler.weight_limit = args.weight_limit
+
+    start_time = int(time.time() * 1000) - args.days * DAY_MILLISECONDS
+    appended = trader.binance.downloader.download_many(
+        args.symbols,
+        args.intervals,
+        start_time,
+        store = trader.binance.candle_store.CandleStore('../candles'),
+        workers = args.workers,
+        on_progress = print_progress,
+    )
+
+    for ((symbol, interval), count) in appended.items():
+        print(f'{symbol} {interval}: {count} candles added')
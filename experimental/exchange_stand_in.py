@@ -0,0 +1,605 @@
+"""
+    Local stand-in for the binance REST api.
+
+    Serves the endpoints used by the bot (time, exchangeInfo, ticker/price,
+    ticker/24hr, klines, account and order) from deterministic price paths,
+    fills the orders with a small matching engine and delays every response
+    by a configurable latency, so that signal_spot_bot.py can be run offline;
+
+        python3 exchange_stand_in.py --port 8080 --latency 0.05 --jitter 0.02
+        BINANCE_BASE_ENDPOINT=http://localhost:8080 python3 signal_spot_bot.py
+
+    Every symbol that ends with one of QUOTE_ASSETS is listed on its first
+    request, so any number of configs can be served without a setup step.
+"""
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append("../")
+# pylint: disable=import-error
+import trader.binance.helper
+
+QUOTE_ASSETS = ['USDT', 'BUSD', 'USDC', 'BTC', 'ETH', 'BNB', 'TRY', 'EUR']
+
+DAY_MILLISECONDS = 24 * 60 * 60 * 1000
+
+# (period in ms, weight) of the waves every WavePath is made of
+WAVES = [
+    (60 * 60 * 1000, 0.05),
+    (6 * 60 * 60 * 1000, 0.15),
+    (DAY_MILLISECONDS, 0.3),
+    (4 * DAY_MILLISECONDS, 0.5),
+    (16 * DAY_MILLISECONDS, 1.0),
+]
+
+# Request weights of the served endpoints, like on binance
+WEIGHTS = {
+    '/api/v3/time': 1,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/klines': 2,
+    '/api/v3/account': 20,
+    '/api/v3/order': 1,
+}
+
+TAKER_COMMISSION = 0.001
+
+
+class ApiError(Exception):
+    """ Rejected request, served as {'code': <code>, 'msg': <message>} """
+
+    def __init__(self, code, message, status = 400, retry_after = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+        self.retry_after = retry_after
+
+
+def _seed(symbol) -> int:
+    return int.from_bytes(hashlib.sha256(symbol.encode()).digest()[:8], 'little')
+
+
+class WavePath:
+    """
+        price(t) = base_price * exp(drift * days + volatility * sum of waves),
+        the phases depend on the symbol so that every symbol moves differently
+        while the same symbol always has the same history
+    """
+
+    def __init__(self, symbol, base_price = None, volatility = 0.05, drift = 0.0):
+        rng = random.Random(_seed(symbol))
+        self.base_price = base_price if base_price is not None else 10 ** rng.uniform(-2, 4)
+        self.volatility = volatility
+        self.drift = drift
+        self.phases = [rng.uniform(0, 2 * math.pi) for _ in WAVES]
+        self.norm = sum(weight for (_, weight) in WAVES)
+
+    def price(self, timestamp) -> float:
+        wave = sum(weight * math.sin(2 * math.pi * timestamp / period + phase) for ((period, weight), phase) in zip(WAVES, self.phases))
+        exponent = self.drift * timestamp / DAY_MILLISECONDS + self.volatility * wave / self.norm
+        return self.base_price * math.exp(exponent)
+
+
+class WaypointPath:
+    """
+        Linear interpolation between (seconds since <start_time>, price) points,
+        the price before the first and after the last point is held
+    """
+
+    def __init__(self, points, start_time):
+        self.times = [start_time + int(seconds * 1000) for (seconds, _) in points]
+        self.prices = [float(price) for (_, price) in points]
+
+    def price(self, timestamp) -> float:
+        if timestamp <= self.times[0]:
+            return self.prices[0]
+        for index in range(1, len(self.times)):
+            if timestamp <= self.times[index]:
+                ratio = (timestamp - self.times[index - 1]) / (self.times[index] - self.times[index - 1])
+                return self.prices[index - 1] + ratio * (self.prices[index] - self.prices[index - 1])
+        return self.prices[-1]
+
+
+class Market:
+    """
+        Price path and LOT_SIZE, PRICE_FILTER and NOTIONAL filters of a symbol
+    """
+
+    def __init__(self, symbol, base_asset, quote_asset, path):
+        self.symbol = symbol
+        self.base_asset = base_asset
+        self.quote_asset = quote_asset
+        self.path = path
+
+        magnitude = math.floor(math.log10(path.price(int(time.time() * 1000))))
+        self.tick_size = 10.0 ** max(-8, magnitude - 4)
+        self.step_size = 10.0 ** min(0, max(-8, -magnitude - 2))
+        self.min_notional = 5.0
+
+    def price(self, timestamp) -> float:
+        return round(self.path.price(timestamp) / self.tick_size) * self.tick_size
+
+    def info(self) -> dict:
+        return {
+            'symbol': self.symbol,
+            'status': 'TRADING',
+            'baseAsset': self.base_asset,
+            'baseAssetPrecision': 8,
+            'quoteAsset': self.quote_asset,
+            'quoteAssetPrecision': 8,
+            'orderTypes': ['LIMIT', 'MARKET'],
+            'isSpotTradingAllowed': True,
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': f'{self.tick_size:.8f}', 'maxPrice': '1000000.00000000', 'tickSize': f'{self.tick_size:.8f}'},
+                {'filterType': 'LOT_SIZE', 'minQty': f'{self.step_size:.8f}', 'maxQty': '9000000.00000000', 'stepSize': f'{self.step_size:.8f}'},
+                {'filterType': 'NOTIONAL', 'minNotional': f'{self.min_notional:.8f}', 'applyMinToMarket': True},
+            ],
+        }
+
+    def kline(self, open_time, interval_milliseconds, now) -> list:
+        close_time = open_time + interval_milliseconds - 1
+        last_time = min(close_time, now)
+        samples = [self.price(open_time + (last_time - open_time) * step // 8) for step in range(9)]
+        volume = 1000.0 * (1.5 + math.sin(open_time / interval_milliseconds))
+        return [
+            open_time,
+            f'{samples[0]:.8f}',
+            f'{max(samples):.8f}',
+            f'{min(samples):.8f}',
+            f'{samples[-1]:.8f}',
+            f'{volume:.8f}',
+            close_time,
+            f'{volume * samples[-1]:.8f}',
+            int(volume),
+            f'{volume / 2:.8f}',
+            f'{volume * samples[-1] / 2:.8f}',
+            '0',
+        ]
+
+
+class Exchange:
+    """
+        Markets, balances and open orders of a single account
+    """
+
+    def __init__(self, balances = None, path_factory = None, slippage = 0.0, secret_key = None, weight_limit = 6000):
+        self.markets = {}
+        self.balances = dict(balances) if balances is not None else {'USDT': 10000.0}
+        self.open_orders = {}
+        self.path_factory = path_factory if path_factory is not None else WavePath
+        self.slippage = slippage
+        self.secret_key = secret_key
+        self.weight_limit = weight_limit
+        # (time, weight) of the requests in the last minute
+        self._requests = deque()
+        self._used_weight = 0
+        self._order_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def list_symbol(self, symbol) -> Market:
+        """ Returns the market of <symbol>, it is listed on the first call """
+        if symbol in self.markets:
+            return self.markets[symbol]
+
+        for quote_asset in QUOTE_ASSETS:
+            if symbol.endswith(quote_asset) and len(symbol) > len(quote_asset):
+                market = Market(symbol, symbol[:-len(quote_asset)], quote_asset, self.path_factory(symbol))
+                self.markets[symbol] = market
+                return market
+
+        raise ApiError(-1121, 'Invalid symbol.')
+
+    def use_weight(self, weight, now) -> int:
+        """ Count the weight of a request, returns the weight used in the last minute """
+        with self._lock:
+            while len(self._requests) > 0 and now - self._requests[0][0] >= 60 * 1000:
+                self._used_weight -= self._requests.popleft()[1]
+
+            if self._used_weight + weight > self.weight_limit:
+                retry_after = 60 - (now - self._requests[0][0]) // 1000
+                raise ApiError(-1003, f'Too much request weight used; retry after {retry_after} seconds.', 429, retry_after)
+
+            self._requests.append((now, weight))
+            self._used_weight += weight
+            return self._used_weight
+
+    def handle(self, method, path, params, headers, now):
+        """ Returns the response body of a request """
+        with self._lock:
+            self._match_orders(now)
+
+            if path == '/api/v3/time':
+                return {'serverTime': now}
+            if path == '/api/v3/exchangeInfo':
+                return self._exchange_info(params, now)
+            if path == '/api/v3/ticker/price':
+                return self._for_symbols(params, lambda market: {'symbol': market.symbol, 'price': f'{market.price(now):.8f}'})
+            if path == '/api/v3/ticker/24hr':
+                return self._for_symbols(params, lambda market: self._statistics(market, now))
+            if path == '/api/v3/klines':
+                return self._klines(params, now)
+            if path == '/api/v3/account' and method == 'GET':
+                self._check_signature(params, headers, now)
+                return self._account(now)
+            if path == '/api/v3/order' and method == 'POST':
+                self._check_signature(params, headers, now)
+                return self._create_order(params, now)
+            if path == '/api/v3/order' and method == 'DELETE':
+                self._check_signature(params, headers, now)
+                return self._cancel_order(params)
+
+        raise ApiError(-1000, f'{method} {path} is not supported by the stand-in', 404)
+
+    def weight(self, path, params) -> int:
+        if path in WEIGHTS:
+            return WEIGHTS[path]
+
+        if path == '/api/v3/ticker/price':
+            return 2 if 'symbol' in params else 4
+
+        # ticker/24hr depends on the number of symbols
+        if 'symbol' in params:
+            return 2
+        if 'symbols' not in params:
+            return 80
+        symbol_count = len(json.loads(params['symbols']))
+        return 2 if symbol_count <= 20 else 40 if symbol_count <= 100 else 80
+
+    def _exchange_info(self, params, now) -> dict:
+        if 'symbol' in params:
+            self.list_symbol(params['symbol'])
+            markets = [self.markets[params['symbol']]]
+        else:
+            markets = self.markets.values()
+
+        return {
+            'timezone': 'UTC',
+            'serverTime': now,
+            'rateLimits': [{'rateLimitType': 'REQUEST_WEIGHT', 'interval': 'MINUTE', 'intervalNum': 1, 'limit': self.weight_limit}],
+            'symbols': [market.info() for market in markets],
+        }
+
+    def _for_symbols(self, params, get_row):
+        if 'symbol' in params:
+            return get_row(self.list_symbol(params['symbol']))
+        if 'symbols' in params:
+            return [get_row(self.list_symbol(symbol)) for symbol in json.loads(params['symbols'])]
+        return [get_row(market) for market in self.markets.values()]
+
+    @staticmethod
+    def _statistics(market, now) -> dict:
+        open_time = now - DAY_MILLISECONDS
+        samples = [market.price(open_time + DAY_MILLISECONDS * step // 24) for step in range(25)]
+        (open_price, last_price) = (samples[0], samples[-1])
+        return {
+            'symbol': market.symbol,
+            'priceChange': f'{last_price - open_price:.8f}',
+            'priceChangePercent': f'{100 * (last_price - open_price) / open_price:.3f}',
+            'weightedAvgPrice': f'{sum(samples) / len(samples):.8f}',
+            'prevClosePrice': f'{open_price:.8f}',
+            'lastPrice': f'{last_price:.8f}',
+            'openPrice': f'{open_price:.8f}',
+            'highPrice': f'{max(samples):.8f}',
+            'lowPrice': f'{min(samples):.8f}',
+            'volume': '24000.00000000',
+            'quoteVolume': f'{24000 * last_price:.8f}',
+            'openTime': open_time,
+            'closeTime': now,
+            'count': 24000,
+        }
+
+    def _klines(self, params, now) -> list:
+        market = self.list_symbol(params.get('symbol', ''))
+        interval = params.get('interval')
+        if interval not in trader.binance.helper.INTERVAL_MILLISECONDS:
+            raise ApiError(-1120, 'Invalid interval.')
+
+        interval_milliseconds = trader.binance.helper.INTERVAL_MILLISECONDS[interval]
+        limit = min(int(params.get('limit', 500)), 1000)
+        last_open_time = now - now % interval_milliseconds
+        if 'endTime' in params:
+            end_time = int(params['endTime'])
+            last_open_time = min(last_open_time, end_time - end_time % interval_milliseconds)
+
+        if 'startTime' in params:
+            start_time = int(params['startTime'])
+            first_open_time = start_time + (-start_time) % interval_milliseconds
+        else:
+            first_open_time = last_open_time - (limit - 1) * interval_milliseconds
+
+        open_times = range(first_open_time, last_open_time + 1, interval_milliseconds)[:limit]
+        return [market.kline(open_time, interval_milliseconds, now) for open_time in open_times]
+
+    def _check_signature(self, params, headers, now):
+        if 'X-MBX-APIKEY' not in headers or 'signature' not in params or 'timestamp' not in params:
+            raise ApiError(-2014, 'API-key format invalid.', 401)
+
+        timestamp = int(params['timestamp'])
+        recv_window = int(params.get('recvWindow', 5000))
+        if timestamp > now + 1000 or now - timestamp > recv_window:
+            raise ApiError(-1021, "Timestamp for this request is outside of the recvWindow.")
+
+        if self.secret_key is not None:
+            payload = '&'.join(f'{key}={value}' for (key, value) in params.items() if key != 'signature')
+            signature = hmac.new(self.secret_key.encode(), payload.encode(), hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(signature, params['signature']):
+                raise ApiError(-1022, 'Signature for this request is not valid.', 401)
+
+    def _account(self, now) -> dict:
+        locked = {}
+        for order in self.open_orders.values():
+            market = self.markets[order['symbol']]
+            if order['side'] == 'BUY':
+                locked[market.quote_asset] = locked.get(market.quote_asset, 0.0) + order['quantity'] * order['price']
+            else:
+                locked[market.base_asset] = locked.get(market.base_asset, 0.0) + order['quantity']
+
+        assets = sorted(set(self.balances) | set(locked))
+        return {
+            'makerCommission': 10,
+            'takerCommission': 10,
+            'canTrade': True,
+            'canWithdraw': True,
+            'canDeposit': True,
+            'updateTime': now,
+            'accountType': 'SPOT',
+            'balances': [
+                {'asset': asset, 'free': f'{self.balances.get(asset, 0.0):.8f}', 'locked': f'{locked.get(asset, 0.0):.8f}'}
+                for asset in assets
+            ],
+            'permissions': ['SPOT'],
+        }
+
+    def _check_filters(self, market, quantity, price):
+        steps = quantity / market.step_size
+        if quantity < market.step_size or abs(steps - round(steps)) > 1e-6:
+            raise ApiError(-1013, 'Filter failure: LOT_SIZE')
+        if quantity * price < market.min_notional:
+            raise ApiError(-1013, 'Filter failure: NOTIONAL')
+
+    def _reserve(self, asset, amount):
+        if self.balances.get(asset, 0.0) < amount - 1e-9:
+            raise ApiError(-2010, 'Account has insufficient balance for requested action.')
+        self.balances[asset] = self.balances.get(asset, 0.0) - amount
+
+    def _create_order(self, params, now) -> dict:
+        market = self.list_symbol(params.get('symbol', ''))
+        side = params.get('side')
+        order_type = params.get('type')
+        if side not in ('BUY', 'SELL') or order_type not in ('MARKET', 'LIMIT'):
+            raise ApiError(-1106, 'Only BUY/SELL MARKET and LIMIT orders are supported by the stand-in.')
+
+        market_price = market.price(now)
+        if order_type == 'MARKET' and 'quoteOrderQty' in params:
+            quantity = math.floor(float(params['quoteOrderQty']) / market_price / market.step_size) * market.step_size
+        else:
+            quantity = float(params.get('quantity', 0))
+
+        order = {
+            'symbol': market.symbol,
+            'orderId': next(self._order_ids),
+            'clientOrderId': params.get('newClientOrderId', f'standin{int(now)}'),
+            'side': side,
+            'type': order_type,
+            'timeInForce': params.get('timeInForce', 'GTC') if order_type == 'LIMIT' else None,
+            'quantity': quantity,
+            'price': float(params['price']) if order_type == 'LIMIT' else 0.0,
+            'time': now,
+        }
+
+        if order_type == 'MARKET':
+            self._check_filters(market, quantity, market_price)
+            slippage = 1 + self.slippage if side == 'BUY' else 1 - self.slippage
+            return self._fill(order, market, market_price * slippage, now)
+
+        self._check_filters(market, quantity, order['price'])
+        if self._is_marketable(order, market_price):
+            return self._fill(order, market, market_price, now)
+
+        # Resting orders hold their balance until they are filled or canceled
+        if side == 'BUY':
+            self._reserve(market.quote_asset, quantity * order['price'])
+        else:
+            self._reserve(market.base_asset, quantity)
+        self.open_orders[order['orderId']] = order
+        return self._order_result(order, 'NEW', 0.0, 0.0, [], now)
+
+    @staticmethod
+    def _is_marketable(order, market_price) -> bool:
+        if order['side'] == 'BUY':
+            return market_price <= order['price']
+        return market_price >= order['price']
+
+    def _fill(self, order, market, price, now, reserved = False) -> dict:
+        quantity = order['quantity']
+        quote_quantity = quantity * price
+
+        if order['side'] == 'BUY':
+            if reserved:
+                # The difference to the limit price is given back
+                self.balances[market.quote_asset] += quantity * order['price'] - quote_quantity
+            else:
+                self._reserve(market.quote_asset, quote_quantity)
+            commission = quantity * TAKER_COMMISSION
+            (commission_asset, received_asset, received) = (market.base_asset, market.base_asset, quantity - commission)
+        else:
+            if not reserved:
+                self._reserve(market.base_asset, quantity)
+            commission = quote_quantity * TAKER_COMMISSION
+            (commission_asset, received_asset, received) = (market.quote_asset, market.quote_asset, quote_quantity - commission)
+
+        self.balances[received_asset] = self.balances.get(received_asset, 0.0) + received
+
+        fills = [{
+            'price': f'{price:.8f}',
+            'qty': f'{quantity:.8f}',
+            'commission': f'{commission:.8f}',
+            'commissionAsset': commission_asset,
+        }]
+        return self._order_result(order, 'FILLED', quantity, quote_quantity, fills, now)
+
+    @staticmethod
+    def _order_result(order, status, executed_quantity, quote_quantity, fills, now) -> dict:
+        return {
+            'symbol': order['symbol'],
+            'orderId': order['orderId'],
+            'orderListId': -1,
+            'clientOrderId': order['clientOrderId'],
+            'transactTime': now,
+            'price': f"{order['price']:.8f}",
+            'origQty': f"{order['quantity']:.8f}",
+            'executedQty': f'{executed_quantity:.8f}',
+            'cummulativeQuoteQty': f'{quote_quantity:.8f}',
+            'status': status,
+            'timeInForce': order['timeInForce'],
+            'type': order['type'],
+            'side': order['side'],
+            'fills': fills,
+        }
+
+    def _cancel_order(self, params) -> dict:
+        order = self.open_orders.pop(int(params.get('orderId', -1)), None)
+        if order is None or order['symbol'] != params.get('symbol'):
+            raise ApiError(-2011, 'Unknown order sent.')
+
+        market = self.markets[order['symbol']]
+        if order['side'] == 'BUY':
+            self.balances[market.quote_asset] += order['quantity'] * order['price']
+        else:
+            self.balances[market.base_asset] += order['quantity']
+        return self._order_result(order, 'CANCELED', 0.0, 0.0, [], order['time'])
+
+    def _match_orders(self, now):
+        """ Fill the resting limit orders the price has reached """
+        for (order_id, order) in list(self.open_orders.items()):
+            market = self.markets[order['symbol']]
+            if self._is_marketable(order, market.price(now)):
+                del self.open_orders[order_id]
+                self._fill(order, market, order['price'], now, reserved = True)
+
+
+class Handler(BaseHTTPRequestHandler):
+    # Keep-alive, the bot reuses its pooled connections
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are separate writes, don't wait for the ack in between
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+    def _handle(self, method):
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+
+        length = int(self.headers.get('Content-Length', 0))
+        if length > 0:
+            params.update(urllib.parse.parse_qsl(self.rfile.read(length).decode()))
+
+        if server.latency > 0 or server.jitter > 0:
+            time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+
+        now = int(time.time() * 1000)
+        headers = {}
+        try:
+            used_weight = server.exchange.use_weight(server.exchange.weight(url.path, params), now)
+            headers['X-MBX-USED-WEIGHT-1M'] = str(used_weight)
+            (status, body) = (200, server.exchange.handle(method, url.path, params, self.headers, now))
+        except ApiError as ex:
+            (status, body) = (ex.status, {'code': ex.code, 'msg': ex.message})
+            if ex.retry_after is not None:
+                headers['Retry-After'] = str(ex.retry_after)
+        except (KeyError, ValueError) as ex:
+            (status, body) = (400, {'code': -1102, 'msg': f'Mandatory parameter was not sent, was empty/null, or malformed: {ex}'})
+
+        data = json.dumps(body, separators = (',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        for (key, value) in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(exchange, host = 'localhost', port = 0, latency = 0.0, jitter = 0.0) -> ThreadingHTTPServer:
+    """ Serve <exchange> on (<host>, <port>), port 0 picks a free port """
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.exchange = exchange
+    server.latency = latency
+    server.jitter = jitter
+    return server
+
+
+def start_in_background(exchange, **kwargs) -> ThreadingHTTPServer:
+    """ Returns the running server, its endpoint is http://localhost:<server.server_port> """
+    server = make_server(exchange, **kwargs)
+    thread = threading.Thread(target = server.serve_forever, name = 'exchange-stand-in')
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def load_path_factory(args):
+    """ WavePath for every symbol unless <args.path_file> has waypoints for it """
+    waypoints = {}
+    if args.path_file is not None:
+        with open(args.path_file, 'r') as path_file:
+            waypoints = json.load(path_file)
+
+    start_time = int(time.time() * 1000)
+
+    def path_factory(symbol):
+        if symbol in waypoints:
+            return WaypointPath(waypoints[symbol], start_time)
+        return WavePath(symbol, volatility = args.volatility, drift = args.drift)
+
+    return path_factory
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Local stand-in for the binance REST api')
+    parser.add_argument('-p', '--port', type = int, default = 8080)
+    parser.add_argument('-l', '--latency', type = float, default = 0.0, help = 'Seconds every response is delayed by.')
+    parser.add_argument('-j', '--jitter', type = float, default = 0.0, help = 'Seconds the latency varies by, uniformly.')
+    parser.add_argument('-b', '--balance', type = float, default = 10000.0, help = 'Initial USDT balance.')
+    parser.add_argument('--volatility', type = float, default = 0.05, help = 'Amplitude of the waves as a ratio of the price.')
+    parser.add_argument('--drift', type = float, default = 0.0, help = 'Log price change per day.')
+    parser.add_argument('--slippage', type = float, default = 0.0, help = 'Ratio the market orders are filled worse by.')
+    parser.add_argument('--path-file', default = None, help = 'JSON file of {symbol: [[seconds, price], ...]} waypoints.')
+    parser.add_argument('--weight-limit', type = int, default = 6000)
+    parser.add_argument('--secret-key', default = None, help = 'Verify the signatures with this secret key.')
+    args = parser.parse_args()
+
+    exchange = Exchange(
+        balances = {'USDT': args.balance},
+        path_factory = load_path_factory(args),
+        slippage = args.slippage,
+        secret_key = args.secret_key,
+        weight_limit = args.weight_limit,
+    )
+
+    server = make_server(exchange, port = args.port, latency = args.latency, jitter = args.jitter)
+    print(f'Serving the exchange stand-in on http://localhost:{args.port}')
+    server.serve_forever()
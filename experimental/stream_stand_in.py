@@ -0,0 +1,95 @@
+"""
+    Local stand-in for the binance combined websocket streams.
+
+    Serves random walk miniTicker and kline events for the requested streams,
+    so that trader.binance.stream.MarketStream can be run offline;
+
+        python3 stream_stand_in.py 8765
+        MarketStream(['BTCUSDT'], ['4h'], base_endpoint = 'ws://localhost:8765')
+"""
+import json
+import random
+import sys
+import time
+import urllib.parse
+
+import websockets.sync.server
+
+sys.path.append("../")
+# pylint: disable=import-error
+import trader.binance.helper
+
+# Seconds between two rounds of events
+EVENT_PERIOD = 0.5
+
+
+def mini_ticker_event(symbol, price, now) -> dict:
+    return {
+        'e': '24hrMiniTicker',
+        'E': now,
+        's': symbol,
+        'c': f'{price:.8f}',
+        'o': f'{price:.8f}',
+        'h': f'{price:.8f}',
+        'l': f'{price:.8f}',
+        'v': '0',
+        'q': '0',
+    }
+
+
+def kline_event(symbol, interval, price, now) -> dict:
+    period = trader.binance.helper.INTERVAL_MILLISECONDS[interval]
+    open_time = now - now % period
+    return {
+        'e': 'kline',
+        'E': now,
+        's': symbol,
+        'k': {
+            't': open_time,
+            'T': open_time + period - 1,
+            's': symbol,
+            'i': interval,
+            'o': f'{price:.8f}',
+            'c': f'{price:.8f}',
+            'h': f'{price:.8f}',
+            'l': f'{price:.8f}',
+            'v': '0',
+            'n': 0,
+            'x': False,
+            'q': '0',
+            'V': '0',
+            'Q': '0',
+        }
+    }
+
+
+def handler(websocket):
+    query = urllib.parse.urlparse(websocket.request.path).query
+    streams = urllib.parse.parse_qs(query).get('streams', [''])[0].split('/')
+    prices = {}
+
+    while True:
+        now = int(time.time() * 1000)
+        for stream in streams:
+            name, _, kind = stream.partition('@')
+            symbol = name.upper()
+            price = prices.get(symbol, 100.0) * (1 + random.uniform(-0.001, 0.001))
+            prices[symbol] = price
+
+            if kind == 'miniTicker':
+                data = mini_ticker_event(symbol, price, now)
+            elif kind.startswith('kline_'):
+                data = kline_event(symbol, kind[len('kline_'):], price, now)
+            else:
+                continue
+
+            websocket.send(json.dumps({'stream': stream, 'data': data}))
+
+        time.sleep(EVENT_PERIOD)
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    with websockets.sync.server.serve(handler, 'localhost', port) as server:
+        print(f'Serving the stream stand-in on ws://localhost:{port}')
+        server.serve_forever()
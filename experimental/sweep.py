@@ -0,0 +1,32 @@
+import sys
+sys.path.append("../")
+# pylint: disable=import-error
+import trader.ssb.backtest
+import trader.ssb.sweep
+from backtest import get_klines_arrays
+
+
+def load_series(symbols, interval):
+    """ Compute the indicator series of every symbol once """
+    for symbol in symbols:
+        (open_times, prices) = get_klines_arrays(symbol, interval)
+        indicators = trader.ssb.backtest.get_indicator_arrays(
+            open_times,
+            prices,
+            get_klines_arrays(symbol, '4h', 400),
+            get_klines_arrays(symbol, '1d', 400),
+        )
+        yield (symbol, interval, prices, indicators)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Please provide at least 2 arguments; INTERVAL SYMBOL [SYMBOL ...]")
+        exit()
+
+    ranked = trader.ssb.sweep.run_sweep(list(load_series(sys.argv[2:], sys.argv[1])))
+
+    print('\nBest:\n')
+    for result in ranked[:10]:
+        print(f"{result['symbol']} {result['interval']} {result['parameters']} / "
+            f"profit:{result['profit_percent']:.2f}% - max drawdown:{result['max_drawdown_percent']:.2f}%")
@@ -4,6 +4,8 @@ let
   python-packages = ps: with ps; [
     requests
     rich
+    websockets
+    numpy
     python-lsp-server
     python-lsp-ruff
   ];
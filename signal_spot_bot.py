@@ -1,17 +1,32 @@
 import argparse
+import concurrent.futures
 import json
+import threading
 import time
 import datetime
 import os.path
 
 import trader.binance.account
+import trader.binance.candle_store
+import trader.binance.client
+import trader.binance.clock
+import trader.binance.filters
 import trader.binance.helper
 import trader.binance.indicators
+import trader.binance.klines
+import trader.binance.market
+import trader.binance.recorder
 import trader.binance.trade
 import trader.constants
 import trader.helper
+import trader.log_reader
+import trader.metrics
+import trader.profiler
 import trader.ssb.constants
 import trader.ssb.helper
+import trader.ssb.signals
+import trader.ssb.state_store
+import trader.ssb.triggers
 
 from tui.ssb_interface import TUI, LiveDataInfo
 
@@ -26,12 +41,8 @@ telegram_api_token = ''
 discord_channel_id = ''
 discord_api_token = ''
 
-# If prevent_loss is enabled,
-# make sure the profit is at least <MIN_PROFIT_PERCENT>
-MIN_PROFIT_PERCENT = 6
-
-BUY_SIGNAL_PERCENT = 100
-SELL_SIGNAL_PERCENT = 80 
+# Candle intervals read by the indicators in perform_bot_operations
+INDICATOR_INTERVALS = ['4h', '1d']
 
 BUY_SIGNAL_EMOJI = '💸'
 SELL_SIGNAL_EMOJI = '🔔'
@@ -39,20 +50,51 @@ SELL_SIGNAL_EMOJI = '🔔'
 # For syncing with the TUI
 live_data_points = {}
 
-def update_and_save_config_file(config_instance):
-    instance_symbol = config_instance['base_currency'] + config_instance['target_currency']
+# Default number of symbols evaluated at the same time
+DEFAULT_WORKER_COUNT = 8
+
+# Seconds between two polling cycles, without a healthy market stream
+POLLING_INTERVAL = 5
+
+# Seconds to wait for a pushed price before the stream health is checked again
+STREAM_WAIT_TIMEOUT = 1
 
-    for current_config_index in range(len(master_config_files)):
+# Serializes the TUI updates of the workers
+live_data_lock = threading.Lock()
 
-        current_config = master_config_files[current_config_index]
-        current_symbol = current_config['base_currency'] + current_config['target_currency']
+# trader.ssb.state_store.StateStore of the trade state, the config file is only read at start up
+state_store = None
 
-        if instance_symbol == current_symbol:
-            master_config_files[current_config_index] = config_instance
-            trader.ssb.helper.write_config_file(master_config_files)
-            return
+BOT_OPERATION_DURATION = trader.metrics.registry.histogram(
+    'ssb_bot_operation_duration_seconds',
+    'Duration of perform_bot_operations per symbol.',
+    ['symbol'],
+)
 
-    raise Exception(f'The symbol {instance_symbol} was not found in the {master_config_files}')
+CYCLE_DURATION = trader.metrics.registry.histogram(
+    'ssb_cycle_duration_seconds',
+    'Duration of a main loop cycle over every enabled symbol, without the sleep.',
+)
+
+def save_config_state(config):
+    symbol = config['base_currency'] + config['target_currency']
+    state_store.save(symbol, config['buy_on_next_trade'], config['last_operation_price'])
+
+def record_trade(config, side, quantity, quote_quantity, price, order_id):
+    """ Save the trade state of <config> together with the filled order """
+    symbol = config['base_currency'] + config['target_currency']
+    state = {
+        'buy_on_next_trade': config['buy_on_next_trade'],
+        'last_operation_price': config['last_operation_price'],
+    }
+    trade = {
+        'side': side,
+        'quantity': quantity,
+        'quote_quantity': quote_quantity,
+        'price': price,
+        'order_id': order_id,
+    }
+    state_store.record_trade(symbol, state, trade)
 
 def is_telegram_enabled():
     return telegram_chat_id != '' and telegram_api_token != ''
@@ -63,8 +105,22 @@ def is_discord_enabled():
 def update_live_data_points(buy_on_next_trade, base_currency, target_currency, is_in_favor, current_price, last_operation_price, difference_in_percent, buy_signal, sell_signal, tui):
     symbol = base_currency + target_currency
     last_updated_time = datetime.datetime.now().strftime('%H:%M:%S')
-    live_data_points[f'{symbol}'] = LiveDataInfo(not buy_on_next_trade, base_currency, target_currency, is_in_favor, current_price, last_operation_price, difference_in_percent, f'{buy_signal} Buy - {sell_signal} Sell {BUY_SIGNAL_EMOJI * buy_signal}{SELL_SIGNAL_EMOJI * sell_signal}', f"{last_updated_time}")
-    tui.live_data.update_data_points(live_data_points.copy())
+    with live_data_lock:
+        live_data_points[f'{symbol}'] = LiveDataInfo(not buy_on_next_trade, base_currency, target_currency, is_in_favor, current_price, last_operation_price, difference_in_percent, f'{buy_signal} Buy - {sell_signal} Sell {BUY_SIGNAL_EMOJI * buy_signal}{SELL_SIGNAL_EMOJI * sell_signal}', f"{last_updated_time}")
+        tui.live_data.update_data_points(live_data_points.copy())
+
+def wait_for_stream_changes(market_stream):
+    """ Returns the symbols the stream pushed a change for, None once it isn't healthy """
+    while market_stream.is_healthy():
+        changed_symbols = market_stream.wait_for_changes(STREAM_WAIT_TIMEOUT)
+        if len(changed_symbols) > 0:
+            return changed_symbols
+    return None
+
+def perform_timed_bot_operations(config, api_key, secret_key, tui):
+    symbol = config['base_currency'] + config['target_currency']
+    with BOT_OPERATION_DURATION.time(symbol):
+        perform_bot_operations(config, api_key, secret_key, tui)
 
 def perform_bot_operations(config, api_key, secret_key, tui):
 
@@ -77,50 +133,38 @@ def perform_bot_operations(config, api_key, secret_key, tui):
     prevent_loss = config['prevent_loss']
 
     symbol = base_currency + target_currency
-    current_price = trader.binance.trade.get_current_trade_ratio(symbol)
-
-    total_indicator_count = 5
-    # Check the indicator signals
-    buy_signal = 0
-    sell_signal = 0
-
-    # RSI indicator
-    rsi_margin = 4.0
-    rsi = trader.binance.indicators.get_rsi(symbol, '4h', moving_average=0, data_count=14)
-    if rsi >= 70 - rsi_margin:
-        sell_signal += 1
-    elif rsi <= 30 + rsi_margin:
-        buy_signal += 1
-
-    # Bollinger bands indicator
-    (upper, _, lower) = trader.binance.indicators.get_bollinger_bands(symbol, '4h', 20)
-
-    if current_price > upper:
-        sell_signal += 1
-    elif current_price < lower:
-        buy_signal += 1
-
-    # Simple moving average
-    sma = trader.binance.indicators.get_sma(symbol, '4h', 9)
-    if current_price > sma:
-        sell_signal += 1
-    elif current_price < sma:
-        buy_signal += 1
-
-    # Exponential moving average (4h)
-    ema = trader.binance.indicators.get_ema(symbol, '4h', 9)
-    if current_price > ema:
-        sell_signal += 1
-    elif current_price < ema:
-        buy_signal += 1
-
-    # Exponential moving average (1d)
-    ema = trader.binance.indicators.get_ema(symbol, '1d', 9)
-    if current_price > ema:
-        sell_signal += 1
-    elif current_price < ema:
-        buy_signal += 1
+    current_price = trader.binance.market.market_snapshot.get_price(symbol)
+
+    # The indicators share the cached klines, keep their forming candle up to date
+    trader.binance.klines.update_last_price(symbol, current_price)
+
+    # The signal counts only change when the price crosses a band edge
+    trigger_key = trader.ssb.triggers.trigger_index.get_key(symbol, buy_on_next_trade, last_operation_price, prevent_loss)
+    signals = trader.ssb.triggers.trigger_index.get_signals(symbol, current_price, trigger_key)
 
+    if signals is not None:
+        (buy_signal, sell_signal) = signals
+    else:
+        # RSI indicator
+        rsi = trader.binance.indicators.get_rsi(symbol, '4h', moving_average=0, data_count=14)
+
+        # Bollinger bands indicator
+        (upper, _, lower) = trader.binance.indicators.get_bollinger_bands(symbol, '4h', 20)
+
+        # Simple moving average
+        sma = trader.binance.indicators.get_sma(symbol, '4h', 9)
+
+        # Exponential moving average (4h)
+        ema_4h = trader.binance.indicators.get_ema(symbol, '4h', 9)
+
+        # Exponential moving average (1d)
+        ema_1d = trader.binance.indicators.get_ema(symbol, '1d', 9)
+
+        # Check the indicator signals
+        (buy_signal, sell_signal) = trader.ssb.signals.count_signals(current_price, rsi, upper, lower, sma, ema_4h, ema_1d)
+
+        min_sell_price = trader.ssb.signals.get_min_sell_price(last_operation_price) if prevent_loss and not buy_on_next_trade else None
+        trader.ssb.triggers.trigger_index.update(symbol, trigger_key, min_sell_price)
 
     if buy_on_next_trade:
         if buy_signal > sell_signal:
@@ -137,8 +181,7 @@ def perform_bot_operations(config, api_key, secret_key, tui):
     difference_in_percent = 100 * (current_price - last_operation_price) / last_operation_price
 
     if buy_on_next_trade:
-        current_buy_signal_percent = 100 * buy_signal / total_indicator_count
-        if current_buy_signal_percent >= BUY_SIGNAL_PERCENT:
+        if trader.ssb.signals.is_buy_signal(buy_signal):
             target_amount = trade_amount_buy
             quantity = target_amount / current_price
             result = trader.binance.trade.create_market_order(
@@ -160,13 +203,13 @@ def perform_bot_operations(config, api_key, secret_key, tui):
 
             config['buy_on_next_trade'] = False
             config['last_operation_price'] = current_price
-            update_and_save_config_file(config)
 
             if 'executedQty' in result.keys():
                 quantity = result['executedQty']
             if 'cummulativeQuoteQty' in result.keys():
                 target_amount = result['cummulativeQuoteQty']
 
+            record_trade(config, 'BUY', quantity, target_amount, current_price, result.get('orderId'))
             log_str = f'Bought {quantity} {base_currency} for {target_amount} '\
                 f'{target_currency} ( {symbol} -> {current_price} )'
             trader.ssb.helper.log(log_str, False)
@@ -186,11 +229,10 @@ def perform_bot_operations(config, api_key, secret_key, tui):
                     log_str
                 )
     else:
-        current_sell_signal_percent = 100 * sell_signal / total_indicator_count
-        if current_sell_signal_percent >= SELL_SIGNAL_PERCENT:
+        if trader.ssb.signals.is_sell_signal(sell_signal):
             # If prevent_loss is enabled,
             # make sure the profit is at least <MIN_PROFIT_PERCENT>
-            if (not prevent_loss) or (prevent_loss and (current_price >= last_operation_price + (last_operation_price * MIN_PROFIT_PERCENT / 100))):
+            if (not prevent_loss) or (prevent_loss and (current_price >= trader.ssb.signals.get_min_sell_price(last_operation_price))):
                 # Create sell order
                 base_amount = trader.binance.account.get_free_balance_amount(
                     api_key,
@@ -228,7 +270,7 @@ def perform_bot_operations(config, api_key, secret_key, tui):
 
                 config['buy_on_next_trade'] = True
                 config['last_operation_price'] = current_price
-                update_and_save_config_file(config)
+                record_trade(config, 'SELL', quantity, target_amount, current_price, result.get('orderId'))
                 log_str = f'Sold {quantity} {base_currency} '\
                     f'for {target_amount} {target_currency} '\
                     f'( {symbol} -> {current_price} )'
@@ -279,16 +321,22 @@ def get_sell_profit_text(base_currency, target_currency, target_amount) -> str:
         return f'(Loss: {difference} {target_currency})'
 
 def calculate_sell_profit(symbol, target_amount) -> float:
+    last_buy = state_store.get_last_buy(symbol)
+    if last_buy is None:
+        return calculate_sell_profit_from_log(symbol, target_amount)
+
+    return float(target_amount) - last_buy['quote_quantity']
+
+def calculate_sell_profit_from_log(symbol, target_amount) -> float:
+    """ For the positions that were bought before the trade ledger existed """
     # Get the latest bought log for <symbol>
-    with open(trader.ssb.constants.LOG_FILE, 'r') as log_file:
-        logs = [log for log in log_file.readlines() if symbol in log and 'Bought' in log]
-        if len(logs) == 0:
-            return 0.0
+    for line in trader.log_reader.reverse_lines(trader.ssb.constants.LOG_FILE):
+        entry = trader.log_reader.parse_line(line)
+        trade = trader.log_reader.parse_trade(entry[1]) if entry is not None else None
+        if trade is not None and trade['side'] == 'BUY' and trade['symbol'] == symbol:
+            return float(target_amount) - trade['quote_quantity']
 
-        last_bought_log = logs[-1]
-        last_bought_target_quantity = float(last_bought_log.split(' ')[4])
-        target_amount = float(target_amount)
-        return target_amount - last_bought_target_quantity
+    return 0.0
 
 if __name__ == '__main__':
 
@@ -307,23 +355,118 @@ if __name__ == '__main__':
                         default = '',
                     )
 
+    parser.add_argument('-w',
+                        '--workers',
+                        help = 'The maximum number of symbols that are evaluated at the same time.',
+                        type = int,
+                        default = DEFAULT_WORKER_COUNT,
+                    )
+
+    parser.add_argument('-s',
+                        '--stream',
+                        help = 'Receive the prices and candles over the websocket streams instead of polling.',
+                        action = 'store_true',
+                    )
+
+    parser.add_argument('-c',
+                        '--candle-store',
+                        help = 'Warm up the indicators from the local candle store instead of downloading the history.',
+                        action = 'store_true',
+                    )
+
+    parser.add_argument('-e',
+                        '--endpoint',
+                        help = 'The binance api endpoint, e.g. a local stand-in like http://localhost:8080.',
+                        type = str,
+                        default = trader.constants.BASE_ENDPOINT,
+                    )
+
+    parser.add_argument('--record',
+                        help = 'Record the binance api traffic into this file.',
+                        type = str,
+                        default = '',
+                    )
+
+    parser.add_argument('--replay',
+                        help = 'Replay a recording instead of connecting to binance, run it in a copy of the working directory.',
+                        type = str,
+                        default = '',
+                    )
+
+    parser.add_argument('--replay-fast',
+                        help = 'Return the replayed responses as fast as possible instead of at the recorded speed.',
+                        action = 'store_true',
+                    )
+
+    parser.add_argument('-m',
+                        '--metrics-port',
+                        help = 'Serve the latency histograms in the Prometheus format on http://localhost:<port>/metrics.',
+                        type = int,
+                        default = 0,
+                    )
+
+    parser.add_argument('--profile',
+                        help = 'Profile every thread for --profile-cycles cycles or --profile-duration seconds, then exit.',
+                        action = 'store_true',
+                    )
+
+    parser.add_argument('--profile-cycles',
+                        help = 'The number of cycles to profile.',
+                        type = int,
+                        default = 10,
+                    )
+
+    parser.add_argument('--profile-duration',
+                        help = 'Seconds to profile, used instead of the number of cycles when given.',
+                        type = float,
+                        default = 0,
+                    )
+
+    parser.add_argument('--profile-output',
+                        help = 'Prefix of the written pstats, collapsed stack and summary files.',
+                        type = str,
+                        default = 'profile_signal_spot_bot',
+                    )
+
     args = parser.parse_args()
+    trader.constants.BASE_ENDPOINT = args.endpoint
+
+    # Started first to include the start up
+    profiler = None
+    if args.profile:
+        profiler = trader.profiler.SamplingProfiler()
+        profiler.start()
+        profiled_cycles = 0
     telegram_chat_id = args.telegram
     discord_channel_id = args.discord
 
+    # Keep a pooled connection for every worker
+    if args.workers > trader.binance.client.DEFAULT_POOL_SIZE:
+        trader.binance.client.default_client = trader.binance.client.BinanceClient(pool_size = args.workers)
+
+    if args.record != '':
+        trader.binance.client.default_client.recorder = trader.binance.recorder.Recorder(args.record)
+
+    replayer = None
+    if args.replay != '':
+        replayer = trader.binance.recorder.Replayer(args.replay, realtime = not args.replay_fast)
+        trader.binance.client.default_client.replayer = replayer
+        replayed_remaining = None
+
+    if args.metrics_port != 0:
+        trader.metrics.start_http_server(args.metrics_port)
+
+    if args.candle_store:
+        trader.binance.klines.candle_store = trader.binance.candle_store.CandleStore()
+
     tui = TUI()
     tui.nonblocking_draw()
 
-    # Load the previous transaction logs if it exists
+    # Load the previous transaction logs if it exists, only the ones the TUI keeps are read
     try:
         if os.path.exists(trader.ssb.constants.LOG_FILE):
-            with open(trader.ssb.constants.LOG_FILE, 'r') as log_file:
-                lines = log_file.readlines()
-                for line in lines:
-                    chunks = line.split("---")
-                    date = str(chunks[0]).strip()
-                    log = str(chunks[1]).strip()
-                    tui.transaction_log.add_log(log, date)
+            for (date, log) in trader.log_reader.read_entries(trader.ssb.constants.LOG_FILE, tui.transaction_log.queue.maxlen):
+                tui.transaction_log.add_log(log, date)
     except Exception as ex:
         tui.program_log.add_log(f"Failed to collect previous transaction log: {ex}")
 
@@ -366,11 +509,43 @@ if __name__ == '__main__':
     for current_config in final_config_files:
         master_config_files.append(current_config)
 
+    # Fetch the prices of every enabled symbol in a single request
+    trader.binance.market.market_snapshot.track(
+        [cc['base_currency'] + cc['target_currency'] for cc in master_config_files if cc['enabled']]
+    )
+
+    state_store = trader.ssb.state_store.StateStore(trader.ssb.constants.STATE_FILE)
+    stored_states = state_store.get_all()
+
     for current_config in master_config_files:
         symbol = current_config['base_currency'] + current_config['target_currency']
 
-        if current_config['last_operation_price'] == -1:
-            current_config['last_operation_price'] = trader.binance.trade.get_current_trade_ratio(symbol)
+        # The state of the previous runs wins over the config file, the config
+        # file is rewritten with it below, so they only differ after an edit
+        if symbol in stored_states:
+            for (key, stored_value) in stored_states[symbol].items():
+                if current_config[key] != stored_value:
+                    err_log = f'{key} of {symbol} is {current_config[key]} in {trader.ssb.constants.CONFIG_FILE} '\
+                        f'but {stored_value} in {trader.ssb.constants.STATE_FILE}, using {stored_value}'
+                    trader.ssb.helper.error_log(err_log, False)
+                    tui.program_log.add_log(err_log)
+            current_config.update(stored_states[symbol])
+
+        # -1 stands for the current price, also when an earlier run stored it
+        if current_config['last_operation_price'] == -1 and current_config['enabled']:
+            # A symbol binance rejects only fails its own operations
+            try:
+                current_config['last_operation_price'] = trader.binance.market.market_snapshot.get_price(symbol)
+            except Exception as ex:
+                err_log = f'Failed to fetch the price of {symbol}, Exception message: {ex}'
+                trader.ssb.helper.error_log(err_log, False)
+                tui.program_log.add_log(err_log)
+
+    # Keep the symbol filters used while creating orders up to date
+    trader.binance.filters.symbol_filters.start_background_refresh()
+
+    # Sample the server clock off the request path of the orders
+    trader.binance.clock.server_clock.start_background_sync()
 
     # Validate the config file
     trader.ssb.helper.validate_config_file(master_config_files)
@@ -378,18 +553,91 @@ if __name__ == '__main__':
     # Update config on the file system
     trader.ssb.helper.write_config_file(master_config_files)
 
+    # The symbols that never traded start from the config file, a -1 is
+    # left out so the next start looks up the current price again
+    for current_config in master_config_files:
+        symbol = current_config['base_currency'] + current_config['target_currency']
+        if current_config['last_operation_price'] == -1:
+            continue
+        state = {key: current_config[key] for key in ('buy_on_next_trade', 'last_operation_price')}
+        if stored_states.get(symbol) != state:
+            save_config_state(current_config)
+
     enabled_symbols = [f"{cc['base_currency']}/{cc['target_currency']}" for cc in master_config_files if cc["enabled"]]
     tui.program_log.add_log(f"Enabled symbols are: {', '.join(enabled_symbols)}")
 
-    while True:
-        for current_config in master_config_files:
-            if current_config['enabled']:
+    market_stream = None
+    if args.stream:
+        # websockets is only needed with --stream
+        import trader.binance.stream
+        market_stream = trader.binance.stream.MarketStream(
+            [cc['base_currency'] + cc['target_currency'] for cc in master_config_files if cc['enabled']],
+            INDICATOR_INTERVALS
+        )
+        market_stream.on_error = lambda ex: tui.program_log.add_log(f'Market stream disconnected, polling until it is back: {ex}')
+        market_stream.start()
+
+    # The symbols to evaluate in the next cycle, None for every enabled one
+    changed_symbols = None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = args.workers, thread_name_prefix = 'ssb-worker') as executor:
+        while True:
+            # The replay ends once a cycle doesn't use any of the remaining responses
+            if replayer is not None:
+                if replayer.remaining == replayed_remaining:
+                    tui.program_log.add_log(f'Finished the replay, {replayed_remaining} recorded responses were not used')
+                    break
+                replayed_remaining = replayer.remaining
+
+            cycle_start = time.perf_counter()
+            try:
+                # The stream keeps the prices up to date while it is healthy
+                if market_stream is None or not market_stream.is_healthy():
+                    trader.binance.market.market_snapshot.refresh_prices()
+            except Exception as ex:
+                err_log = f'Error at refresh_prices, Exception message: {ex}'
+                trader.ssb.helper.error_log(err_log, False)
+                tui.program_log.add_log(err_log)
+                time.sleep(POLLING_INTERVAL)
+                continue
+
+            futures = {}
+            for current_config in master_config_files:
+                symbol = current_config['base_currency'] + current_config['target_currency']
+                if current_config['enabled'] and (changed_symbols is None or symbol in changed_symbols):
+                    future = executor.submit(perform_timed_bot_operations, current_config, api_key, secret_key, tui)
+                    futures[future] = current_config
+
+            # An error only affects the symbol it was raised for
+            for future in concurrent.futures.as_completed(futures):
                 try:
-                    perform_bot_operations(current_config, api_key, secret_key, tui) 
+                    future.result()
                 except Exception as ex:
+                    current_config = futures[future]
                     symbol = current_config['base_currency'] + current_config['target_currency']
                     err_log = f'Error at perform_bot_operations for: {symbol}, Exception message: {ex}'
                     trader.ssb.helper.error_log(err_log, False)
                     tui.program_log.add_log(err_log)
 
-        time.sleep(5)
+            CYCLE_DURATION.observe(time.perf_counter() - cycle_start)
+
+            if profiler is not None:
+                profiled_cycles += 1
+                if args.profile_duration > 0:
+                    is_profiled = time.time() - profiler.start_time >= args.profile_duration
+                else:
+                    is_profiled = profiled_cycles >= args.profile_cycles
+
+                if is_profiled:
+                    profiler.stop()
+                    paths = profiler.write(args.profile_output)
+                    tui.program_log.add_log(f"Profiled {profiled_cycles} cycles into {', '.join(paths)}")
+                    break
+
+            if replayer is None or replayer.realtime:
+                # A healthy stream wakes the loop up on every pushed price
+                changed_symbols = None
+                if market_stream is not None:
+                    changed_symbols = wait_for_stream_changes(market_stream)
+                if changed_symbols is None:
+                    time.sleep(POLLING_INTERVAL)
@@ -0,0 +1,71 @@
+"""
+    Reading the log files backwards with trader.log_reader
+"""
+import pytest
+
+import trader.log_reader
+
+
+def write_log(tmp_path, content) -> str:
+    path = tmp_path / 'log.txt'
+    path.write_bytes(content.encode('utf-8'))
+    return str(path)
+
+
+def test_reverse_lines_of_an_empty_file(tmp_path):
+    path = write_log(tmp_path, '')
+
+    assert list(trader.log_reader.reverse_lines(path)) == []
+    assert trader.log_reader.read_last_lines(path, 5) == []
+    assert trader.log_reader.read_entries(path, 5) == []
+
+
+@pytest.mark.parametrize('content', ['first\nsecond\nthird\n', 'first\nsecond\nthird'])
+def test_reverse_lines_with_and_without_a_final_line_break(tmp_path, content):
+    path = write_log(tmp_path, content)
+
+    assert list(trader.log_reader.reverse_lines(path)) == ['third', 'second', 'first']
+    assert trader.log_reader.read_last_lines(path, 2) == ['second', 'third']
+
+
+def test_reverse_lines_keeps_the_empty_lines(tmp_path):
+    path = write_log(tmp_path, '\nfirst\n\nsecond\n')
+
+    assert list(trader.log_reader.reverse_lines(path)) == ['second', '', 'first', '']
+
+
+@pytest.mark.parametrize('block_size', [1, 2, 3, 7, 16, 4096])
+@pytest.mark.parametrize('is_terminated', [True, False])
+def test_reverse_lines_across_block_boundaries(tmp_path, block_size, is_terminated):
+    # Lines longer and shorter than the blocks, with a multi byte character
+    lines = [f'line {index} ' + 'x' * (index * 5) + ' ₿' for index in range(20)]
+    path = write_log(tmp_path, '\n'.join(lines) + ('\n' if is_terminated else ''))
+
+    assert list(trader.log_reader.reverse_lines(path, block_size)) == lines[::-1]
+    assert trader.log_reader.read_last_lines(path, 3, block_size) == lines[-3:]
+    assert trader.log_reader.read_last_lines(path, 100, block_size) == lines
+
+
+def test_read_entries_skips_the_lines_without_a_date(tmp_path):
+    path = write_log(tmp_path, '2024.01.01 - 10:00:01 --- Bought 1 BTC for 10 USDT\nnot an entry\n2024.01.01 - 10:00:02 --- Sold 1 BTC for 12 USDT\n')
+
+    assert trader.log_reader.read_entries(path, 2) == [('2024.01.01 - 10:00:02', 'Sold 1 BTC for 12 USDT')]
+    assert trader.log_reader.read_entries(path) == [
+        ('2024.01.01 - 10:00:01', 'Bought 1 BTC for 10 USDT'),
+        ('2024.01.01 - 10:00:02', 'Sold 1 BTC for 12 USDT'),
+    ]
+
+
+def test_parse_trade():
+    trade = trader.log_reader.parse_trade('Sold 0.5 BTC for 15000.0 USDT ( BTCUSDT -> 30000.0 )')
+
+    assert trade == {
+        'side': 'SELL',
+        'quantity': 0.5,
+        'base_currency': 'BTC',
+        'quote_quantity': 15000.0,
+        'target_currency': 'USDT',
+        'symbol': 'BTCUSDT',
+        'price': 30000.0,
+    }
+    assert trader.log_reader.parse_trade('Enabled symbols are: BTC/USDT') is None
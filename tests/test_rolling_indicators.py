@@ -0,0 +1,94 @@
+"""
+    The Rolling* indicators must give the same values as the indicators that
+    read the whole window, over closed and forming data points alike.
+"""
+import random
+
+import pytest
+
+import trader.indicators
+
+# Relative difference allowed between the rolling and the full values
+TOLERANCE = 1e-9
+
+# Closed data points of every random walk
+WALK_LENGTH = 300
+
+# Forming data points before each close
+FORMING_UPDATES = 5
+
+
+def random_walk(seed, length = WALK_LENGTH):
+    """ Yields (close, forming prices) of a random price walk """
+    generator = random.Random(seed)
+    price = generator.uniform(0.001, 50000)
+
+    for _ in range(length):
+        forming = []
+        for _ in range(FORMING_UPDATES):
+            price = max(price * (1 + generator.gauss(0, 0.02)), 1e-8)
+            forming.append(price)
+        yield (price, forming)
+
+
+def replay(indicator, full_indicator, seed):
+    """
+        Feed a random walk to <indicator>, a candle is appended with update and
+        moved with replace_last until it closes, and compare its value with
+        <full_indicator> of the same window after every change
+    """
+    window = []
+    for (close, forming) in random_walk(seed):
+        for (index, price) in enumerate(forming + [close]):
+            if index == 0:
+                indicator.update(price)
+                window.append(price)
+            else:
+                indicator.replace_last(price)
+                window[-1] = price
+            del window[:-indicator.size]
+
+            expected = full_indicator(window)
+            assert indicator.value == pytest.approx(expected, rel = TOLERANCE, abs = TOLERANCE)
+
+
+def full_rsi(moving_average):
+    def get_rsi(window):
+        # get_rsi divides by zero without a downward change, RollingRSI returns 100
+        changes = [window[index] - window[index - 1] for index in range(1, len(window))]
+        if len(changes) > 0 and all(change > 0 for change in changes):
+            return 100
+        return trader.indicators.get_rsi(window, moving_average)
+    return get_rsi
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('size', [2, 10, 21])
+def test_rolling_sma(seed, size):
+    replay(trader.indicators.RollingSMA(size), trader.indicators.get_sma, seed)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('size', [2, 10, 21])
+def test_rolling_ema(seed, size):
+    replay(trader.indicators.RollingEMA(size), trader.indicators.get_ema, seed)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('size', [3, 16, 17])
+@pytest.mark.parametrize('moving_average', [0, 1])
+def test_rolling_rsi(seed, size, moving_average):
+    replay(trader.indicators.RollingRSI(size, moving_average), full_rsi(moving_average), seed)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('size', [2, 10, 21])
+def test_rolling_bollinger(seed, size):
+    replay(trader.indicators.RollingBollinger(size), trader.indicators.get_bollinger_bands, seed)
+
+
+def test_rolling_rsi_without_downward_change():
+    indicator = trader.indicators.RollingRSI(5)
+    for price in [1, 2, 3, 4, 5]:
+        indicator.update(price)
+    assert indicator.value == 100
@@ -0,0 +1,86 @@
+"""
+    The trade state and the ledger of trader.ssb.state_store
+"""
+import pytest
+
+import trader.ssb.state_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    state_store = trader.ssb.state_store.StateStore(str(tmp_path / 'state.db'))
+    yield state_store
+    state_store.close()
+
+
+def make_trade(side, quantity = 0.5, quote_quantity = 10.0, price = 20.0, order_id = None) -> dict:
+    return {
+        'side': side,
+        'quantity': quantity,
+        'quote_quantity': quote_quantity,
+        'price': price,
+        'order_id': order_id,
+    }
+
+
+def test_record_trade_saves_the_state_and_the_trade(store):
+    trade_id = store.record_trade('BTCUSDT', {'buy_on_next_trade': False, 'last_operation_price': 20.0}, make_trade('BUY', order_id = '7'))
+
+    assert store.get('BTCUSDT') == {'buy_on_next_trade': False, 'last_operation_price': 20.0}
+    trades = store.get_trades('BTCUSDT')
+    assert [trade['id'] for trade in trades] == [trade_id]
+    assert trades[0]['side'] == 'BUY'
+    assert trades[0]['order_id'] == 7
+
+
+@pytest.mark.parametrize('trade', [
+    make_trade('HOLD'),
+    make_trade('BUY', quantity = 'not a number'),
+    make_trade('SELL', price = None),
+])
+def test_record_trade_is_atomic(store, trade):
+    store.save('BTCUSDT', True, 10.0)
+
+    with pytest.raises(Exception):
+        store.record_trade('BTCUSDT', {'buy_on_next_trade': False, 'last_operation_price': 20.0}, trade)
+
+    # The state row is rolled back together with the trade row
+    assert store.get('BTCUSDT') == {'buy_on_next_trade': True, 'last_operation_price': 10.0}
+    assert store.get_trades() == []
+    assert store.get_last_buy('BTCUSDT') is None
+
+
+def test_record_trade_without_a_previous_state_is_atomic(store):
+    with pytest.raises(Exception):
+        store.record_trade('ETHUSDT', {'buy_on_next_trade': False, 'last_operation_price': 20.0}, make_trade('HOLD'))
+
+    assert store.get('ETHUSDT') is None
+    assert store.get_all() == {}
+
+
+def test_get_last_buy(store):
+    assert store.get_last_buy('BTCUSDT') is None
+
+    store.record_trade('BTCUSDT', {'buy_on_next_trade': False, 'last_operation_price': 20.0}, make_trade('BUY', price = 20.0))
+    last_buy_id = store.record_trade('BTCUSDT', {'buy_on_next_trade': False, 'last_operation_price': 25.0}, make_trade('BUY', price = 25.0))
+    store.record_trade('ETHUSDT', {'buy_on_next_trade': False, 'last_operation_price': 2.0}, make_trade('BUY', price = 2.0))
+    store.record_trade('BTCUSDT', {'buy_on_next_trade': True, 'last_operation_price': 30.0}, make_trade('SELL', price = 30.0))
+
+    # A sell does not replace the latest buy
+    last_buy = store.get_last_buy('BTCUSDT')
+    assert last_buy['id'] == last_buy_id
+    assert last_buy['price'] == 25.0
+    assert store.get_last_buy('ETHUSDT')['price'] == 2.0
+    assert [trade['side'] for trade in store.get_trades('BTCUSDT')] == ['BUY', 'BUY', 'SELL']
+
+
+def test_the_state_survives_a_reopen(tmp_path):
+    path = str(tmp_path / 'state.db')
+    state_store = trader.ssb.state_store.StateStore(path)
+    state_store.record_trade('BTCUSDT', {'buy_on_next_trade': False, 'last_operation_price': 20.0}, make_trade('BUY'))
+    state_store.close()
+
+    state_store = trader.ssb.state_store.StateStore(path)
+    assert state_store.get_all() == {'BTCUSDT': {'buy_on_next_trade': False, 'last_operation_price': 20.0}}
+    assert state_store.get_last_buy('BTCUSDT')['quote_quantity'] == 10.0
+    state_store.close()
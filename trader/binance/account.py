@@ -1,15 +1,8 @@
-import requests
 import trader.binance.helper
-import trader.constants
 
 
 def get_account_information(api_key, secret_key) -> dict:
-    timestamp = trader.binance.helper.get_server_timestamp()
-    total_params = f'timestamp={timestamp}'
-    signature = trader.binance.helper.create_signature(secret_key, total_params)
-    headers = {'X-MBX-APIKEY': api_key}
-
-    response = requests.get(f'{trader.constants.BASE_ENDPOINT}/api/v3/account?{total_params}&signature={signature}', headers = headers)
+    response = trader.binance.helper.send_signed_request('GET', '/api/v3/account', '', api_key, secret_key)
 
     if response.status_code != 200:
         raise Exception(f'Failed to post -> get_account_information, response: {response.text}')
@@ -0,0 +1,277 @@
+"""
+    Local archive of closed klines.
+
+    Every (symbol, interval) pair is a directory of append-only column files,
+    one raw little-endian array per field of CANDLE_DTYPE, and a small header
+    with the number of committed candles. Reads memory map the columns, so
+    reading the closes touches the closes only and no column is copied.
+
+    A candle is committed once the header counts it, bytes after the count
+    are left over from an interrupted append and are cut off by the next one.
+    A rewrite writes a new generation of the columns and switches to it by
+    replacing the header.
+"""
+import os
+import struct
+import time
+
+import numpy as np
+
+import trader.binance.helper
+import trader.constants
+
+CANDLE_DTYPE = np.dtype([
+    ('open_time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+    ('close_time', '<i8'),
+    ('quote_volume', '<f8'),
+    ('trade_count', '<i8'),
+])
+
+COLUMNS = CANDLE_DTYPE.names
+
+# magic, version, interval in ms, generation of the column files, committed candle count
+HEADER_FORMAT = '<8sIqqq'
+HEADER_FILE = 'header'
+MAGIC = b'TRCANDLE'
+VERSION = 2
+
+# Maximum number of klines binance returns per request
+PAGE_SIZE = 1000
+
+
+def klines_to_records(klines) -> np.ndarray:
+    """ Convert klines in the REST format into CANDLE_DTYPE records """
+    records = np.empty(len(klines), dtype = CANDLE_DTYPE)
+    for (index, kline) in enumerate(klines):
+        records[index] = (
+            int(kline[0]),
+            float(kline[1]),
+            float(kline[2]),
+            float(kline[3]),
+            float(kline[4]),
+            float(kline[5]),
+            int(kline[6]),
+            float(kline[7]),
+            int(kline[8]),
+        )
+    return records
+
+
+class Candles:
+    """
+        Column name -> array of the same candles, e.g. candles['close'].
+        The arrays of a read are read-only memory maps of the column files.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def empty(cls):
+        return cls({name: np.empty(0, dtype = CANDLE_DTYPE[name]) for name in COLUMNS})
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.columns[name]
+
+    def __len__(self) -> int:
+        return len(self.columns['open_time'])
+
+    def slice(self, start, end):
+        return Candles({name: column[start:end] for (name, column) in self.columns.items()})
+
+    def to_records(self) -> np.ndarray:
+        """ Copy the candles into CANDLE_DTYPE records """
+        records = np.empty(len(self), dtype = CANDLE_DTYPE)
+        for name in COLUMNS:
+            records[name] = self.columns[name]
+        return records
+
+
+def _sort_unique(records) -> np.ndarray:
+    """ Sort <records> by open time and keep one record per open time """
+    (_, indexes) = np.unique(records['open_time'], return_index = True)
+    return records[indexes]
+
+
+class CandleStore:
+    """
+        Reads and appends the candle columns under <directory>
+    """
+
+    def __init__(self, directory = None):
+        self.directory = directory if directory is not None else trader.constants.CANDLE_STORE_DIRECTORY
+
+    def path(self, symbol, interval) -> str:
+        return os.path.join(self.directory, f'{symbol}_{interval}')
+
+    def _column_path(self, symbol, interval, generation, name) -> str:
+        return os.path.join(self.path(symbol, interval), f'{generation}.{name}')
+
+    @staticmethod
+    def _interval_milliseconds(interval) -> int:
+        if interval not in trader.binance.helper.INTERVAL_MILLISECONDS:
+            raise Exception(f'{interval} is not supported by the candle store')
+        return trader.binance.helper.INTERVAL_MILLISECONDS[interval]
+
+    def _read_header(self, symbol, interval):
+        """ Returns (generation, count), None if the pair was never stored """
+        header_path = os.path.join(self.path(symbol, interval), HEADER_FILE)
+        if not os.path.exists(header_path):
+            return None
+
+        with open(header_path, 'rb') as header_file:
+            (magic, version, interval_milliseconds, generation, count) = struct.unpack(HEADER_FORMAT, header_file.read(struct.calcsize(HEADER_FORMAT)))
+
+        if magic != MAGIC or version != VERSION:
+            raise Exception(f'{self.path(symbol, interval)} is not a version {VERSION} candle store')
+
+        if interval_milliseconds != self._interval_milliseconds(interval):
+            raise Exception(f'{self.path(symbol, interval)} does not hold {interval} candles')
+
+        return (generation, count)
+
+    def _write_header(self, symbol, interval, generation, count):
+        """ Commit <count> candles of <generation> atomically """
+        header_path = os.path.join(self.path(symbol, interval), HEADER_FILE)
+        temp_path = f'{header_path}.tmp'
+        with open(temp_path, 'wb') as header_file:
+            header_file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, self._interval_milliseconds(interval), generation, count))
+        os.replace(temp_path, header_path)
+
+    def read(self, symbol, interval, start_time = None, end_time = None) -> Candles:
+        """
+            Returns the candles that opened between <start_time> and <end_time> (ms),
+            every column is a read-only memory mapped array
+        """
+        header = self._read_header(symbol, interval)
+        if header is None or header[1] == 0:
+            return Candles.empty()
+
+        (generation, count) = header
+        columns = {}
+        for name in COLUMNS:
+            columns[name] = np.memmap(self._column_path(symbol, interval, generation, name), dtype = CANDLE_DTYPE[name], mode = 'r', shape = (count,))
+        candles = Candles(columns)
+
+        open_times = candles['open_time']
+        start = 0 if start_time is None else int(np.searchsorted(open_times, start_time, side = 'left'))
+        end = count if end_time is None else int(np.searchsorted(open_times, end_time, side = 'right'))
+        return candles.slice(start, end)
+
+    def get_last_open_time(self, symbol, interval):
+        """ Returns the open time of the newest stored candle, or None """
+        candles = self.read(symbol, interval)
+        if len(candles) == 0:
+            return None
+        return int(candles['open_time'][-1])
+
+    def append(self, symbol, interval, klines) -> int:
+        """
+            Append the closed klines that are newer than the stored ones.
+            Returns the number of appended candles.
+        """
+        records = klines if isinstance(klines, np.ndarray) else klines_to_records(klines)
+
+        # The forming candle would change after it is stored
+        now = int(time.time() * 1000)
+        records = records[records['close_time'] < now]
+
+        last_open_time = self.get_last_open_time(symbol, interval)
+        if last_open_time is not None:
+            records = records[records['open_time'] > last_open_time]
+
+        if len(records) == 0:
+            return 0
+
+        if np.any(np.diff(records['open_time']) <= 0):
+            records = _sort_unique(records)
+
+        header = self._read_header(symbol, interval)
+        if header is None:
+            os.makedirs(self.path(symbol, interval), exist_ok = True)
+            header = (0, 0)
+
+        (generation, count) = header
+        for name in COLUMNS:
+            with open(self._column_path(symbol, interval, generation, name), 'ab') as column_file:
+                # Cut off what an interrupted append left after the committed candles
+                column_file.truncate(count * CANDLE_DTYPE[name].itemsize)
+                column_file.write(np.ascontiguousarray(records[name]).tobytes())
+
+        self._write_header(symbol, interval, generation, count + len(records))
+        return len(records)
+    def find_gaps(self, symbol, interval, start_time = None, end_time = None) -> list:
+        """
+            Returns the [(start_time, end_time)] ranges of the missing candles
+            between the stored ones that opened between <start_time> and <end_time> (ms)
+        """
+        open_times = self.read(symbol, interval, start_time, end_time)['open_time']
+        interval_milliseconds = self._interval_milliseconds(interval)
+
+        gaps = []
+        for index in np.flatnonzero(np.diff(open_times) > interval_milliseconds):
+            gaps.append((int(open_times[index]) + interval_milliseconds, int(open_times[index + 1]) - interval_milliseconds))
+        return gaps
+
+    def backfill(self, symbol, interval, start_time = None, end_time = None) -> int:
+        """
+            Download the missing candles of find_gaps and rewrite the columns
+            with them, the gaps that binance has no candles for stay as they are.
+            Returns the number of added candles.
+        """
+        gaps = self.find_gaps(symbol, interval, start_time, end_time)
+        if len(gaps) == 0:
+            return 0
+
+        interval_milliseconds = self._interval_milliseconds(interval)
+        missing = []
+        for (start_time, end_time) in gaps:
+            while start_time <= end_time:
+                klines = trader.binance.helper.get_klines_data(symbol, interval, PAGE_SIZE, start_time, end_time)
+                if len(klines) == 0:
+                    break
+                missing.append(klines_to_records(klines))
+                start_time = int(klines[-1][0]) + interval_milliseconds
+
+        if len(missing) == 0:
+            return 0
+
+        missing = np.concatenate(missing)
+        self._rewrite(symbol, interval, np.concatenate((self.read(symbol, interval).to_records(), missing)))
+        return len(missing)
+
+    def sync(self, symbol, interval, start_time) -> int:
+        """
+            Append every closed candle after the newest stored one, or after
+            <start_time> (ms) for an empty store. Returns the number of appended candles.
+        """
+        last_open_time = self.get_last_open_time(symbol, interval)
+        if last_open_time is not None:
+            start_time = last_open_time + self._interval_milliseconds(interval)
+
+        appended = 0
+        while True:
+            klines = trader.binance.helper.get_klines_data(symbol, interval, PAGE_SIZE, start_time)
+            count = self.append(symbol, interval, klines)
+            appended += count
+            if len(klines) < PAGE_SIZE or count == 0:
+                return appended
+            start_time = int(klines[-1][0]) + self._interval_milliseconds(interval)
+
+    def _rewrite(self, symbol, interval, records):
+        """ Replace the columns with the sorted <records> atomically """
+        records = _sort_unique(records)
+        (generation, _) = self._read_header(symbol, interval)
+
+        for name in COLUMNS:
+            with open(self._column_path(symbol, interval, generation + 1, name), 'wb') as column_file:
+                column_file.write(np.ascontiguousarray(records[name]).tobytes())
+        self._write_header(symbol, interval, generation + 1, len(records))
+
+        for name in COLUMNS:
+            os.remove(self._column_path(symbol, interval, generation, name))
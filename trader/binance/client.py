@@ -0,0 +1,143 @@
+"""
+    HTTP client shared by the trader.binance modules
+"""
+import time
+
+import requests
+import requests.adapters
+import trader.binance.clock
+import trader.binance.helper
+import trader.binance.rate_limit
+import trader.constants
+import trader.metrics
+
+# Seconds to wait for the connection and for the response
+DEFAULT_TIMEOUT = (5, 15)
+
+# Number of keep-alive connections kept open per host
+DEFAULT_POOL_SIZE = 16
+
+# Times a request is sent again after a 429, once the back off is over
+RATE_LIMIT_RETRIES = 2
+
+REQUEST_DURATION = trader.metrics.registry.histogram(
+    'binance_request_duration_seconds',
+    'Duration of the binance api requests.',
+    ['method', 'endpoint', 'status'],
+)
+
+
+class BinanceClient:
+    """
+        Sends the binance api requests over a pooled keep-alive session.
+
+        <base_endpoint> defaults to trader.constants.BASE_ENDPOINT, the api and
+        secret keys are used by the signed requests unless a call provides its own.
+
+        Every request waits for its turn in the <scheduler>, a
+        trader.binance.rate_limit.RequestScheduler, by its weight and priority.
+        The priority defaults to the one of the endpoint; orders first, kline
+        refreshes last.
+
+        With a trader.binance.recorder.Recorder as <recorder> every request is
+        recorded, with a Replayer as <replayer> the recorded responses are
+        returned instead of sending the requests.
+    """
+
+    def __init__(self, api_key = None, secret_key = None, base_endpoint = None, timeout = DEFAULT_TIMEOUT, pool_size = DEFAULT_POOL_SIZE, scheduler = None):
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.timeout = timeout
+        self._base_endpoint = base_endpoint
+        self.scheduler = scheduler if scheduler is not None else trader.binance.rate_limit.RequestScheduler()
+        self.recorder = None
+        self.replayer = None
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def base_endpoint(self) -> str:
+        if self._base_endpoint is not None:
+            return self._base_endpoint
+        return trader.constants.BASE_ENDPOINT
+
+    def request(self, method, path, params = '', headers = None, priority = None) -> requests.Response:
+        for _ in range(RATE_LIMIT_RETRIES):
+            response = self._send(method, path, params, headers, priority)
+            if response.status_code != 429:
+                return response
+
+        return self._send(method, path, params, headers, priority)
+
+    def _send(self, method, path, params, headers, priority) -> requests.Response:
+        if self.replayer is not None:
+            return self.replayer.replay(method, path, params)
+
+        url = f'{self.base_endpoint}{path}'
+        if params:
+            url = f'{url}?{params}'
+
+        if priority is None:
+            priority = trader.binance.rate_limit.get_priority(path)
+        self.scheduler.acquire(trader.binance.rate_limit.get_request_weight(path, params), priority)
+
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, url, headers = headers, timeout = self.timeout)
+        except Exception:
+            REQUEST_DURATION.observe(time.monotonic() - started, method, path, 'error')
+            raise
+
+        duration = time.monotonic() - started
+        REQUEST_DURATION.observe(duration, method, path, str(response.status_code))
+        self.scheduler.update(response)
+
+        if self.recorder is not None:
+            self.recorder.record(method, path, params, response, started, duration)
+
+        return response
+
+    def get(self, path, params = '', priority = None) -> requests.Response:
+        return self.request('GET', path, params, priority = priority)
+
+    def signed_request(self, method, path, params = '', api_key = None, secret_key = None, priority = None) -> requests.Response:
+        """
+            Sign <params> with the estimated server time and send the request.
+
+            If the server rejects the timestamp (-1021), the clock is
+            synced again and the request is sent one more time. After a
+            429 the request is signed again, the back off can outlast the
+            recvWindow of the previous timestamp.
+        """
+        api_key = api_key if api_key is not None else self.api_key
+        secret_key = secret_key if secret_key is not None else self.secret_key
+        headers = {'X-MBX-APIKEY': api_key}
+
+        is_clock_resynced = False
+        rate_limit_retries = 0
+        while True:
+            timestamp = trader.binance.clock.server_clock.timestamp()
+            total_params = f'timestamp={timestamp}&recvWindow={trader.constants.RECV_WINDOW}'
+            if params:
+                total_params = f'{params}&{total_params}'
+            signature = trader.binance.helper.create_signature(secret_key, total_params)
+
+            response = self._send(method, path, f'{total_params}&signature={signature}', headers, priority)
+
+            if not is_clock_resynced and trader.binance.helper.is_timestamp_error(response):
+                trader.binance.clock.server_clock.resync()
+                is_clock_resynced = True
+                continue
+
+            if response.status_code == 429 and rate_limit_retries < RATE_LIMIT_RETRIES:
+                rate_limit_retries += 1
+                continue
+
+            return response
+
+
+# Shared by every trader.binance module
+default_client = BinanceClient()
@@ -0,0 +1,114 @@
+"""
+    Local estimate of the binance server clock
+"""
+import threading
+import time
+from collections import deque
+
+import trader.binance.helper
+
+# Seconds after which the server clock is sampled again
+CLOCK_RESYNC_INTERVAL = 5 * 60
+
+# Number of samples used while estimating the offset and the drift
+CLOCK_SAMPLE_COUNT = 8
+
+# Drift is only estimated once the samples span at least this many ms
+MIN_DRIFT_SPAN = 60 * 1000
+
+
+def _local_time() -> float:
+    return time.time() * 1000
+
+
+class ServerClock:
+    """
+        Estimates the server time from the local clock.
+
+        Every sample takes the midpoint of the request round trip as the local
+        time the server answered at, the offset and drift are then fitted over
+        the latest samples so that signed requests don't need a round trip.
+        Once start_background_sync is called the server clock is sampled
+        every <resync_interval> seconds off the request path.
+    """
+
+    def __init__(self, resync_interval = CLOCK_RESYNC_INTERVAL):
+        self.resync_interval = resync_interval
+        self.offset = 0.0
+        self.drift = 0.0
+        self.reference_time = None
+        self.last_sync_time = None
+        self._samples = deque(maxlen = CLOCK_SAMPLE_COUNT)
+        self._lock = threading.Lock()
+        self._sync_thread = None
+
+    def sync(self):
+        """ Sample the server time once and update the estimate """
+        request_time = _local_time()
+        server_time = trader.binance.helper.get_server_timestamp()
+        response_time = _local_time()
+
+        midpoint = (request_time + response_time) / 2
+
+        with self._lock:
+            self._samples.append((midpoint, server_time - midpoint))
+            self._estimate()
+            self.last_sync_time = response_time
+
+    def resync(self):
+        """ Drop the previous samples, e.g. after a timestamp error """
+        with self._lock:
+            self._samples.clear()
+        self.sync()
+
+    def timestamp(self) -> int:
+        """ Returns the estimated server time in ms, only the first call waits for a sample """
+        if self.last_sync_time is None:
+            self.sync()
+
+        with self._lock:
+            now = _local_time()
+            return int(now + self.offset + self.drift * (now - self.reference_time))
+
+    def start_background_sync(self):
+        if self._sync_thread is not None:
+            return
+
+        self._sync_thread = threading.Thread(target = self._sync_loop, name = 'server-clock-sync')
+        self._sync_thread.daemon = True
+        self._sync_thread.start()
+
+    def _sync_loop(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                # Keep the previous estimate, try again on the next round
+                pass
+            time.sleep(self.resync_interval)
+
+    def _estimate(self):
+        count = len(self._samples)
+        mean_time = sum(sample[0] for sample in self._samples) / count
+        mean_offset = sum(sample[1] for sample in self._samples) / count
+
+        self.reference_time = mean_time
+        self.offset = mean_offset
+        self.drift = 0.0
+
+        if self._samples[-1][0] - self._samples[0][0] < MIN_DRIFT_SPAN:
+            return
+
+        # Least squares slope of the offset over the local time
+        covariance = 0.0
+        variance = 0.0
+        for (sample_time, sample_offset) in self._samples:
+            covariance += (sample_time - mean_time) * (sample_offset - mean_offset)
+            variance += (sample_time - mean_time) ** 2
+
+        if variance > 0:
+            self.drift = covariance / variance
+
+
+# Shared by every signed request
+server_clock = ServerClock()
@@ -0,0 +1,103 @@
+"""
+    Bulk kline downloader that fills the local candle store
+"""
+import concurrent.futures
+import time
+from collections import deque
+
+import trader.binance.candle_store
+import trader.binance.helper
+
+# Number of pages downloaded at the same time
+DEFAULT_WORKER_COUNT = 8
+
+# Attempts per page before the download is given up
+PAGE_ATTEMPTS = 5
+
+
+def get_page_ranges(start_time, end_time, interval) -> list:
+    """ Split [<start_time>, <end_time>] into (start, end) ranges of PAGE_SIZE candles """
+    interval_milliseconds = trader.binance.helper.INTERVAL_MILLISECONDS[interval]
+    page_span = trader.binance.candle_store.PAGE_SIZE * interval_milliseconds
+
+    # Candles open on the multiples of the interval
+    start_time = start_time - start_time % interval_milliseconds
+
+    return [(page_start, min(page_start + page_span - 1, end_time)) for page_start in range(start_time, end_time + 1, page_span)]
+
+
+def _fetch_page(symbol, interval, page_range) -> list:
+    (start_time, end_time) = page_range
+    for attempt in range(PAGE_ATTEMPTS):
+        try:
+            return trader.binance.helper.get_klines_data(symbol, interval, trader.binance.candle_store.PAGE_SIZE, start_time, end_time)
+        except Exception:
+            if attempt == PAGE_ATTEMPTS - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def download(symbol, interval, start_time, end_time = None, store = None, workers = DEFAULT_WORKER_COUNT, on_progress = None) -> int:
+    """
+        Download the <symbol> candles between <start_time> and <end_time> (ms)
+        into <store>, the pages are fetched concurrently. The weight of the
+        requests is limited by the scheduler of the shared client, at the low
+        priority of the klines, so the other requests of the process go first.
+
+        The pages are appended in order, so the store itself is the checkpoint;
+        an interrupted download resumes after the newest stored candle.
+        <on_progress>(done_pages, total_pages) is called after every page.
+        Returns the number of appended candles.
+    """
+    store = store if store is not None else trader.binance.candle_store.CandleStore()
+    end_time = end_time if end_time is not None else int(time.time() * 1000)
+
+    last_open_time = store.get_last_open_time(symbol, interval)
+    if last_open_time is not None:
+        start_time = max(start_time, last_open_time + trader.binance.helper.INTERVAL_MILLISECONDS[interval])
+
+    page_ranges = get_page_ranges(start_time, end_time, interval)
+    appended = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = workers, thread_name_prefix = 'kline-download') as executor:
+        # Only a few pages ahead of the appended ones are in flight
+        remaining = iter(page_ranges)
+        pending = deque()
+        for page_range in remaining:
+            pending.append(executor.submit(_fetch_page, symbol, interval, page_range))
+            if len(pending) >= workers * 2:
+                break
+
+        done_pages = 0
+        while len(pending) > 0:
+            klines = pending.popleft().result()
+
+            next_page_range = next(remaining, None)
+            if next_page_range is not None:
+                pending.append(executor.submit(_fetch_page, symbol, interval, next_page_range))
+
+            appended += store.append(symbol, interval, klines)
+            done_pages += 1
+            if on_progress is not None:
+                on_progress(done_pages, len(page_ranges))
+
+    return appended
+
+
+def download_many(symbols, intervals, start_time, end_time = None, store = None, workers = DEFAULT_WORKER_COUNT, on_progress = None) -> dict:
+    """
+        Download every (symbol, interval) pair one after the other.
+        <on_progress>(symbol, interval, done_pages, total_pages)
+        Returns {(symbol, interval): appended candle count}
+    """
+    appended = {}
+
+    for symbol in symbols:
+        for interval in intervals:
+            progress = None
+            if on_progress is not None:
+                progress = lambda done, total, symbol = symbol, interval = interval: on_progress(symbol, interval, done, total)
+
+            appended[(symbol, interval)] = download(symbol, interval, start_time, end_time, store, workers, progress)
+
+    return appended
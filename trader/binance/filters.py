@@ -0,0 +1,146 @@
+"""
+    Exchange info index for the symbol filters
+"""
+import decimal
+import threading
+import time
+import trader.binance.client
+
+# Seconds between two refreshes of the exchange info in the background
+EXCHANGE_INFO_REFRESH_INTERVAL = 60 * 60
+
+
+def _to_decimal(value):
+    if value is None:
+        return None
+    return decimal.Decimal(str(value))
+
+
+def _decimal_places(value) -> int:
+    """ Number of decimal points required to represent <value> """
+    exponent = value.normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+class SymbolFilter:
+    """
+        Parsed LOT_SIZE, PRICE_FILTER and MIN_NOTIONAL values of a symbol
+    """
+
+    def __init__(self, info):
+        self.symbol = info['symbol']
+        self.quote_asset_precision = int(info['quoteAssetPrecision'])
+
+        self.step_size = None
+        self.min_quantity = None
+        self.max_quantity = None
+        self.tick_size = None
+        self.min_price = None
+        self.max_price = None
+        self.min_notional = None
+
+        for current_filter in info['filters']:
+            filter_type = current_filter['filterType']
+            if filter_type == 'LOT_SIZE':
+                self.step_size = _to_decimal(current_filter['stepSize'])
+                self.min_quantity = _to_decimal(current_filter['minQty'])
+                self.max_quantity = _to_decimal(current_filter['maxQty'])
+            elif filter_type == 'PRICE_FILTER':
+                self.tick_size = _to_decimal(current_filter['tickSize'])
+                self.min_price = _to_decimal(current_filter['minPrice'])
+                self.max_price = _to_decimal(current_filter['maxPrice'])
+            elif filter_type in ('MIN_NOTIONAL', 'NOTIONAL'):
+                self.min_notional = _to_decimal(current_filter.get('minNotional'))
+
+        # Quantities can't be more precise than the step size nor the precision
+        quantity_places = self.quote_asset_precision
+        if self.step_size:
+            quantity_places = min(quantity_places, _decimal_places(self.step_size))
+        self.quantity_quantizer = decimal.Decimal(1).scaleb(-quantity_places)
+
+        price_places = self.quote_asset_precision
+        if self.tick_size:
+            price_places = min(price_places, _decimal_places(self.tick_size))
+        self.price_quantizer = decimal.Decimal(1).scaleb(-price_places)
+
+    def normalize_quantity(self, quantity) -> decimal.Decimal:
+        """ Round <quantity> down to a multiple of the step size """
+        quantity = _to_decimal(float(quantity))
+        if self.step_size:
+            quantity = (quantity // self.step_size) * self.step_size
+        return quantity.quantize(self.quantity_quantizer, rounding = decimal.ROUND_DOWN)
+
+    def normalize_price(self, price) -> decimal.Decimal:
+        """ Round <price> down to a multiple of the tick size """
+        price = _to_decimal(float(price))
+        if self.tick_size:
+            price = (price // self.tick_size) * self.tick_size
+        return price.quantize(self.price_quantizer, rounding = decimal.ROUND_DOWN)
+
+
+class SymbolFilters:
+    """
+        Index of SymbolFilter instances keyed by symbol.
+
+        The exchange info is downloaded once and refreshed in the background
+        every <refresh_interval> seconds once start_background_refresh is called.
+    """
+
+    def __init__(self, refresh_interval = EXCHANGE_INFO_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self.last_refresh_time = None
+        self._filters = {}
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def load(self):
+        """ Download the exchange info and rebuild the index """
+        response = trader.binance.client.default_client.get('/api/v3/exchangeInfo')
+
+        if response.status_code != 200:
+            raise Exception(f'Failed while fetching exchange info, response: {response.text}')
+
+        self.update(response.json()['symbols'])
+
+    def update(self, symbol_infos):
+        """ Rebuild the index from the 'symbols' list of an exchange info """
+        filters = {}
+        for info in symbol_infos:
+            filters[info['symbol']] = SymbolFilter(info)
+
+        with self._lock:
+            self._filters = filters
+            self.last_refresh_time = time.time()
+
+    def get(self, symbol) -> SymbolFilter:
+        if self.last_refresh_time is None:
+            self.load()
+
+        with self._lock:
+            symbol_filter = self._filters.get(symbol)
+
+        if symbol_filter is None:
+            raise Exception(f'{symbol} does not exist in the exchange info')
+
+        return symbol_filter
+
+    def start_background_refresh(self):
+        if self._refresh_thread is not None:
+            return
+
+        self._refresh_thread = threading.Thread(target = self._refresh_loop, name = 'exchange-info-refresh')
+        self._refresh_thread.daemon = True
+        self._refresh_thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            try:
+                self.load()
+            except Exception:
+                # Keep serving the previous index, try again on the next round
+                pass
+
+
+# Shared by every trader.binance module
+symbol_filters = SymbolFilters()
@@ -4,18 +4,13 @@
 import hmac
 import decimal
 import hashlib
-import requests
-import trader.constants
+import trader.binance.client
+import trader.binance.filters
+import trader.binance.market
 
 def get_precision_for_symbol(symbol) -> int:
     """ Get the maximum allowed number of decimal points for the given symbol """
-    response = requests.get(f'{trader.constants.BASE_ENDPOINT}/api/v3/exchangeInfo')
-    response_dict = response.json()
-    for info in response_dict['symbols']:
-        if info['symbol'] == symbol:
-            return int(info['quoteAssetPrecision'])
-
-    raise Exception(f'{symbol} does not exist in the exchange info') 
+    return trader.binance.filters.symbol_filters.get(symbol).quote_asset_precision
 
 
 def update_quantity_according_lot_size_filter(symbol, quantity) -> str:
@@ -25,39 +20,11 @@ def update_quantity_according_lot_size_filter(symbol, quantity) -> str:
         restriction 1 -> quantity % step_size == 0
         restriction 2 -> quantity must have maximum `precision` decimal points
     """
-    response = requests.get(f'{trader.constants.BASE_ENDPOINT}/api/v3/exchangeInfo')
-    response_dict = response.json()
-    for info in response_dict['symbols']:
-        if info['symbol'] == symbol:
-            filters = info['filters']
-            for current_filter in filters:
-                if current_filter['filterType'] == 'LOT_SIZE':
-                    step_size = float(current_filter['stepSize'])
-                    step_size_str = decimal.Context().create_decimal(repr(step_size))
-                    step_size_str = format(step_size_str, 'f')
-                    # Avoid doing this (even though the logic is correct for all scenarios)
-                    # unless step_size ends with 1
-                    # Because in small numbers, mod operation returns wrong results
-                    # which results in wrong quantity value thus fails the order request
-                    if step_size_str[len(step_size_str) - 1] != '1' and quantity % step_size != 0 and quantity % step_size > 0.00000001:
-                        quantity -= quantity % step_size
-
-                    step_size_prec = 0
-                    for ch in step_size_str:
-                        if ch == '.':
-                            continue
-                        elif ch != '0':
-                            break
-                        else:
-                            step_size_prec += 1
-
-                    # Make sure the quantity is not more precise than the precision
-                    precision = get_precision_for_symbol(symbol)
-                    target_precision = min(precision, step_size_prec)
-                    quantity_str = str(value_to_decimal(quantity, target_precision))
-                    return quantity_str
-    
-    raise Exception(f'{symbol} does not exist in the exchange info or LOT_SIZE is not in filters')
+    symbol_filter = trader.binance.filters.symbol_filters.get(symbol)
+    if symbol_filter.step_size is None:
+        raise Exception(f'LOT_SIZE is not in the filters of {symbol}')
+
+    return format(symbol_filter.normalize_quantity(quantity), 'f')
 
 
 def create_signature(secret_key, message):
@@ -69,14 +36,29 @@ def create_signature(secret_key, message):
     return hmac.new(secret_key, message, hashlib.sha256).hexdigest()
 
 
+def send_signed_request(method, path, params, api_key, secret_key):
+    """ Send a signed request through the shared client """
+    return trader.binance.client.default_client.signed_request(method, path, params, api_key, secret_key)
+
+
+def is_timestamp_error(response) -> bool:
+    """ True if the request was rejected because of its timestamp """
+    if response.status_code == 200:
+        return False
+
+    try:
+        return response.json().get('code') == -1021
+    except ValueError:
+        return False
+
+
 def value_to_decimal(value, decimal_places):
     decimal.getcontext().rounding = decimal.ROUND_DOWN
     return decimal.Decimal(str(float(value))).quantize(decimal.Decimal('1e-{}'.format(decimal_places)))
 
 def get_24h_statistics(symbol):
 
-    url = f'{trader.constants.BASE_ENDPOINT}/api/v3/ticker/24hr?symbol={symbol}'
-    response = requests.get(url)
+    response = trader.binance.client.default_client.get('/api/v3/ticker/24hr', f'symbol={symbol}')
 
     if response.status_code != 200:
         raise Exception(f'Failed while fetching 24hr statistics for {symbol}')
@@ -84,7 +66,8 @@ def get_24h_statistics(symbol):
     return response.json()
 
 def get_24hr_price_change_percent(symbol) -> float:
-    statistics = get_24h_statistics(symbol)
+    """ Read from the batched 24hr statistics of the shared market snapshot """
+    statistics = trader.binance.market.market_snapshot.get_statistics(symbol)
     if 'priceChangePercent' in statistics:
         return float(statistics['priceChangePercent'])
 
@@ -92,7 +75,7 @@ def get_24hr_price_change_percent(symbol) -> float:
 
 
 def get_server_timestamp() -> int:    
-    response = requests.get(f'{trader.constants.BASE_ENDPOINT}/api/v3/time')
+    response = trader.binance.client.default_client.get('/api/v3/time')
 
     if response.status_code != 200:
         raise Exception(f'Failed while fetching server time, response: {response.text}')
@@ -100,7 +83,25 @@ def get_server_timestamp() -> int:
     return int(response.json()['serverTime'])
 
 
-def get_klines_data(symbol, interval, limit = 1000):
+# Length of the fixed size kline intervals in ms
+INTERVAL_MILLISECONDS = {
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1h': 60 * 60 * 1000,
+    '2h': 2 * 60 * 60 * 1000,
+    '4h': 4 * 60 * 60 * 1000,
+    '6h': 6 * 60 * 60 * 1000,
+    '8h': 8 * 60 * 60 * 1000,
+    '12h': 12 * 60 * 60 * 1000,
+    '1d': 24 * 60 * 60 * 1000,
+    '3d': 3 * 24 * 60 * 60 * 1000,
+    '1w': 7 * 24 * 60 * 60 * 1000,
+}
+
+def get_klines_data(symbol, interval, limit = 1000, start_time = None, end_time = None):
     accepted_intervals = ["1m", "3m", "5m", "15m", "30m", "1h", "2h", "4h", "6h", "8h", "12h", "1d", "3d", "1w", "1M"]
     
     if interval not in accepted_intervals:
@@ -115,9 +116,17 @@ def get_klines_data(symbol, interval, limit = 1000):
     if limit <= 0:
         raise Exception(f'limit must be a positive integer, it was {limit}')
 
-    target_url = f'{trader.constants.BASE_ENDPOINT}/api/v3/klines?symbol={symbol}&interval={interval}&limit={limit}'
+    params = f'symbol={symbol}&interval={interval}&limit={limit}'
+
+    # Only return the klines that opened at or after <start_time> (ms)
+    if start_time is not None:
+        params += f'&startTime={int(start_time)}'
+
+    # Only return the klines that opened at or before <end_time> (ms)
+    if end_time is not None:
+        params += f'&endTime={int(end_time)}'
 
-    response = requests.get(target_url)
+    response = trader.binance.client.default_client.get('/api/v3/klines', params)
 
     if response.status_code != 200:
         raise Exception(f'Failed while fetching klines data, response: {response.text}')
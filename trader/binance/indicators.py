@@ -1,19 +1,24 @@
 from typing import Tuple
 
-import trader.binance.helper
+import trader.binance.klines
 import trader.indicators
+import trader.metrics
+
+INDICATOR_DURATION = trader.metrics.registry.histogram(
+    'indicator_duration_seconds',
+    'Duration of the indicator computations, including the kline reads.',
+    ['indicator', 'interval'],
+)
+
+# The indicators are kept as trader.indicators.Rolling* instances on the kline
+# windows, a poll only moves their forming data point to the latest price and
+# the closed candles are added once, when they close
 
 def get_close_data(symbol, interval, data_count) -> list:
     """
-        Returns a list of floats
+        Returns a list of floats, served from the shared kline windows
     """
-    klines = trader.binance.helper.get_klines_data(symbol, interval, int(data_count) + 1)
-    
-    close_data = []
-    for data_point in klines:
-        close_data.append(float(data_point[4]))
-    
-    return close_data
+    return trader.binance.klines.get_closes(symbol, interval, int(data_count) + 1)
 
 def get_rsi(symbol, interval, moving_average = 0, data_count = 14) -> float:
     """
@@ -24,9 +29,16 @@ def get_rsi(symbol, interval, moving_average = 0, data_count = 14) -> float:
             1 - EMA (Exponential Moving Average)
     """
 
-    # Fetch <data_count + 1> days to calculate the change on <data_count> days
-    close_data = get_close_data(symbol, interval, data_count + 1)
-    return trader.indicators.get_rsi(close_data, moving_average)
+    with INDICATOR_DURATION.time('rsi', interval):
+        # Fetch <data_count + 1> days to calculate the change on <data_count> days
+        size = int(data_count) + 2
+        return trader.binance.klines.get_indicator(
+            symbol,
+            interval,
+            size,
+            ('rsi', size, moving_average),
+            lambda: trader.indicators.RollingRSI(size, moving_average)
+        )
 
 
 def get_bollinger_bands(symbol, interval, data_count = 20) -> Tuple[float, float, float]:
@@ -34,21 +46,24 @@ def get_bollinger_bands(symbol, interval, data_count = 20) -> Tuple[float, float
         Returns (upper, middle, lower) bollinger bands
     """
 
-    close_data = get_close_data(symbol, interval, data_count)
-    return trader.indicators.get_bollinger_bands(close_data)
+    with INDICATOR_DURATION.time('bollinger_bands', interval):
+        size = int(data_count) + 1
+        return trader.binance.klines.get_indicator(symbol, interval, size, ('bollinger_bands', size), lambda: trader.indicators.RollingBollinger(size))
 
 def get_sma(symbol, interval, data_count = 9) -> float:
     """
         Returns simple moving average
     """
 
-    close_data = get_close_data(symbol, interval, data_count)
-    return trader.indicators.get_sma(close_data)
+    with INDICATOR_DURATION.time('sma', interval):
+        size = int(data_count) + 1
+        return trader.binance.klines.get_indicator(symbol, interval, size, ('sma', size), lambda: trader.indicators.RollingSMA(size))
 
 def get_ema(symbol, interval, data_count = 9) -> float:
     """
         Returns exponential moving average
     """
     
-    close_data = get_close_data(symbol, interval, data_count)
-    return trader.indicators.get_ema(close_data)
+    with INDICATOR_DURATION.time('ema', interval):
+        size = int(data_count) + 1
+        return trader.binance.klines.get_indicator(symbol, interval, size, ('ema', size), lambda: trader.indicators.RollingEMA(size))
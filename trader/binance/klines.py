@@ -0,0 +1,290 @@
+"""
+    Rolling kline windows shared by the indicator functions
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+import trader.binance.helper
+
+# Minimum number of klines held for a (symbol, interval) pair,
+# a single window serves every indicator window up to this length
+MIN_CACHED_KLINE_COUNT = 100
+
+# Number of klines asked for while catching up with the latest candles,
+# if the response is full the window has fallen behind and is reloaded
+INCREMENTAL_KLINE_LIMIT = 10
+
+# Versions of the closed candles of every window, never reused
+_versions = itertools.count()
+
+# Optional trader.binance.candle_store.CandleStore, if it is set the windows
+# warm up from the stored candles instead of downloading the whole history
+candle_store = None
+
+
+def record_to_kline(record) -> list:
+    """ Convert a candle store record into the REST kline format """
+    return [
+        int(record['open_time']),
+        str(record['open']),
+        str(record['high']),
+        str(record['low']),
+        str(record['close']),
+        str(record['volume']),
+        int(record['close_time']),
+        str(record['quote_volume']),
+        int(record['trade_count']),
+        '0',
+        '0',
+        '0',
+    ]
+
+
+class KlineWindow:
+    """
+        The latest <size> klines of a (symbol, interval) pair.
+
+        The history is loaded once, after that only the candles that opened
+        at or after the forming candle are fetched and merged into the window.
+
+        The rolling indicators of the window follow its closes, a closed candle
+        is added to them once and the forming candle only replaces their last
+        data point, so the closed part of every indicator is reused until the
+        next candle closes.
+    """
+
+    def __init__(self, symbol, interval, size):
+        self.symbol = symbol
+        self.interval = interval
+        self.size = size
+        self.klines = deque(maxlen = size)
+        # Close prices parsed once per kline
+        self.closes = deque(maxlen = size)
+        # key -> trader.indicators.RollingIndicator over the latest closes
+        self.indicators = {}
+        # Changes whenever a candle is added to or removed from the closed ones
+        self.version = next(_versions)
+        # Held for every change of the window, the stream thread and the
+        # workers merge into the same window
+        self._lock = threading.Lock()
+
+    def load(self):
+        """ Download the whole window """
+        if candle_store is not None and self.interval in trader.binance.helper.INTERVAL_MILLISECONDS:
+            self._load_from_store()
+            return
+
+        klines = trader.binance.helper.get_klines_data(self.symbol, self.interval, self.size)
+        self._reset(klines)
+
+    def _load_from_store(self):
+        """ Read the closed candles from the store, only the newer ones are downloaded """
+        interval_milliseconds = trader.binance.helper.INTERVAL_MILLISECONDS[self.interval]
+        start_time = int(time.time() * 1000) - self.size * interval_milliseconds
+        candle_store.sync(self.symbol, self.interval, start_time)
+
+        if len(candle_store.find_gaps(self.symbol, self.interval, start_time)) > 0:
+            candle_store.backfill(self.symbol, self.interval, start_time)
+
+        candles = candle_store.read(self.symbol, self.interval, start_time)
+        if not self._is_covered(candles, start_time, interval_milliseconds):
+            # A hole binance has no candles for, or a symbol listed recently
+            self._reset(trader.binance.helper.get_klines_data(self.symbol, self.interval, self.size))
+            return
+
+        self._reset([record_to_kline(record) for record in candles.to_records()])
+
+        # The forming candle is never stored
+        with self._lock:
+            start_time = int(self.klines[-1][0]) + interval_milliseconds
+        for kline in trader.binance.helper.get_klines_data(self.symbol, self.interval, INCREMENTAL_KLINE_LIMIT, start_time):
+            self.merge(kline)
+
+    def _is_covered(self, candles, start_time, interval_milliseconds) -> bool:
+        """ <candles> are every closed candle since <start_time>, without any gap """
+        if len(candles) == 0:
+            return False
+
+        open_times = candles['open_time']
+        if int(open_times[0]) - start_time >= interval_milliseconds:
+            return False
+        if int(time.time() * 1000) - int(open_times[-1]) >= 2 * interval_milliseconds:
+            return False
+        return len(candles) == (int(open_times[-1]) - int(open_times[0])) // interval_milliseconds + 1
+
+    def refresh(self):
+        """ Fetch the candles newer than the last one in the window """
+        with self._lock:
+            start_time = int(self.klines[-1][0]) if len(self.klines) > 0 else None
+
+        if start_time is None:
+            self.load()
+            return
+
+        new_klines = trader.binance.helper.get_klines_data(
+            self.symbol,
+            self.interval,
+            INCREMENTAL_KLINE_LIMIT,
+            start_time
+        )
+
+        if len(new_klines) >= INCREMENTAL_KLINE_LIMIT:
+            self.load()
+            return
+
+        for kline in new_klines:
+            self.merge(kline)
+
+    def merge(self, kline):
+        """ Replace the forming candle with <kline> or append it if it is newer """
+        with self._lock:
+            if len(self.klines) == 0 or int(kline[0]) > int(self.klines[-1][0]):
+                self._append(kline)
+            elif int(kline[0]) == int(self.klines[-1][0]):
+                # Replace the forming candle in place
+                self.klines[-1] = kline
+                self._replace_last_close(float(kline[4]))
+
+    def is_expired(self) -> bool:
+        """ True when there is no kline yet or the forming candle has closed """
+        with self._lock:
+            if len(self.klines) == 0:
+                return True
+
+            # Index 6 is the close time of the candle
+            close_time = int(self.klines[-1][6])
+
+        return int(time.time() * 1000) > close_time
+
+    def update_last_price(self, price):
+        """ Move the close of the forming candle to <price> """
+        with self._lock:
+            if len(self.klines) == 0:
+                return
+
+            forming_kline = self.klines[-1]
+            forming_kline[4] = str(price)
+            if price > float(forming_kline[2]):
+                forming_kline[2] = str(price)
+            if price < float(forming_kline[3]):
+                forming_kline[3] = str(price)
+            self._replace_last_close(float(price))
+
+    def get_klines(self, limit) -> list:
+        with self._lock:
+            return list(self.klines)[-limit:]
+
+    def get_closes(self, limit) -> list:
+        with self._lock:
+            return list(self.closes)[-limit:]
+
+    def get_indicator(self, key, create):
+        """
+            Returns the value of the rolling indicator called <key>, on the first
+            call it is made by <create>() and seeded with the latest closes
+        """
+        with self._lock:
+            indicator = self.indicators.get(key)
+            if indicator is None:
+                indicator = create()
+                for close in list(self.closes)[-indicator.size:]:
+                    indicator.update(close)
+                self.indicators[key] = indicator
+            return indicator.value
+
+    def _reset(self, klines):
+        """ Replace every kline of the window with <klines> """
+        with self._lock:
+            self.klines.clear()
+            self.closes.clear()
+            self.indicators.clear()
+            self.version = next(_versions)
+            for kline in klines:
+                self._append(kline)
+
+    def _append(self, kline):
+        """ The caller holds the lock """
+        close = float(kline[4])
+        self.klines.append(kline)
+        self.closes.append(close)
+        self.version = next(_versions)
+        for indicator in self.indicators.values():
+            indicator.update(close)
+
+    def _replace_last_close(self, close):
+        """ The caller holds the lock """
+        self.closes[-1] = close
+        for indicator in self.indicators.values():
+            indicator.replace_last(close)
+
+
+# (symbol, interval) -> KlineWindow
+_windows = {}
+_windows_lock = threading.Lock()
+
+
+def get_window(symbol, interval, limit) -> KlineWindow:
+    """
+        Returns the window of the pair that holds at least <limit> klines,
+        the window is brought up to date once its forming candle closes
+    """
+    key = (symbol, interval)
+    with _windows_lock:
+        window = _windows.get(key)
+
+    if window is None or window.size < limit:
+        window = KlineWindow(symbol, interval, max(limit, MIN_CACHED_KLINE_COUNT))
+        window.load()
+        with _windows_lock:
+            _windows[key] = window
+    elif window.is_expired():
+        window.refresh()
+
+    return window
+
+
+def get_cached_window(symbol, interval):
+    """ Returns the window of the pair if it was loaded before, else None """
+    with _windows_lock:
+        return _windows.get((symbol, interval))
+
+
+def get_cached_windows(symbol) -> list:
+    """ Returns every loaded window of <symbol> """
+    with _windows_lock:
+        return [window for (cached_symbol, _), window in _windows.items() if cached_symbol == symbol]
+
+
+def get_klines(symbol, interval, limit) -> list:
+    """ Returns the latest <limit> klines for the symbol """
+    return get_window(symbol, interval, limit).get_klines(limit)
+
+
+def get_closes(symbol, interval, limit) -> list:
+    """ Returns the latest <limit> close prices for the symbol """
+    return get_window(symbol, interval, limit).get_closes(limit)
+
+
+def get_indicator(symbol, interval, limit, key, create):
+    """
+        Returns the value of a rolling indicator over the latest <limit> closes,
+        <create>() must return a trader.indicators.RollingIndicator of that size
+    """
+    return get_window(symbol, interval, limit).get_indicator(key, create)
+
+
+def update_last_price(symbol, price):
+    """
+        Move the close of the forming candle of every cached
+        interval for <symbol> to the latest traded price
+    """
+    for window in get_cached_windows(symbol):
+        window.update_last_price(price)
+
+
+def clear():
+    """ Drop every cached window """
+    with _windows_lock:
+        _windows.clear()
@@ -0,0 +1,163 @@
+"""
+    Batched market snapshot of the tracked symbols
+"""
+import json
+import threading
+import time
+import urllib.parse
+
+import trader.binance.client
+
+# Seconds a snapshot is served before it is fetched again
+SNAPSHOT_MAX_AGE = 5
+
+# Binance error code of an unknown (e.g. delisted or misspelled) symbol
+INVALID_SYMBOL_CODE = -1121
+
+# Seconds a rejected symbol is left out of the batches before it is tried again
+REJECTED_SYMBOL_RETRY = 300
+
+
+def _symbols_param(symbols) -> str:
+    return 'symbols=' + urllib.parse.quote(json.dumps(sorted(symbols), separators = (',', ':')))
+
+
+def _is_invalid_symbol(response) -> bool:
+    try:
+        return response.status_code == 400 and response.json().get('code') == INVALID_SYMBOL_CODE
+    except ValueError:
+        return False
+
+
+class MarketSnapshot:
+    """
+        Symbol -> price and symbol -> 24hr statistics tables.
+
+        Every refresh fetches the whole table for the tracked symbols in a
+        single request instead of one request per symbol.
+
+        Binance rejects the whole batch if a single symbol is unknown. The
+        symbols are then fetched one by one, the rejected ones are left out
+        of the batches for <REJECTED_SYMBOL_RETRY> seconds and only their own
+        get_price and get_statistics calls fail.
+    """
+
+    def __init__(self, max_age = SNAPSHOT_MAX_AGE):
+        self.max_age = max_age
+        self.symbols = set()
+        self.prices = {}
+        self.statistics = {}
+        self.price_times = {}
+        self.statistics_time = None
+        # symbol -> (time, response text) of the symbols binance rejected
+        self.rejected_symbols = {}
+        self._lock = threading.Lock()
+
+    def track(self, symbols):
+        """ Include <symbols> in the following refreshes """
+        with self._lock:
+            self.symbols.update(symbols)
+
+    def refresh_prices(self):
+        with self._lock:
+            self._refresh_prices()
+
+    def refresh_statistics(self):
+        with self._lock:
+            self._refresh_statistics()
+
+    def set_price(self, symbol, price):
+        """ Store a price received outside of the refreshes, e.g. from the stream """
+        with self._lock:
+            self.prices[symbol] = float(price)
+            self.price_times[symbol] = time.time()
+
+    def get_price(self, symbol) -> float:
+        with self._lock:
+            self._check_rejected(symbol)
+            if self._is_stale(self.price_times.get(symbol)):
+                self.symbols.add(symbol)
+                self._refresh_prices()
+
+            if symbol not in self.prices:
+                raise Exception(f'{symbol} does not exist in the price snapshot')
+
+            return self.prices[symbol]
+
+    def get_statistics(self, symbol) -> dict:
+        with self._lock:
+            self._check_rejected(symbol)
+            if symbol not in self.statistics or self._is_stale(self.statistics_time):
+                self.symbols.add(symbol)
+                self._refresh_statistics()
+
+            if symbol not in self.statistics:
+                raise Exception(f'{symbol} does not exist in the 24hr statistics snapshot')
+
+            return self.statistics[symbol]
+
+    def _is_stale(self, snapshot_time) -> bool:
+        return snapshot_time is None or time.time() - snapshot_time > self.max_age
+
+    def _check_rejected(self, symbol):
+        if symbol not in self.rejected_symbols:
+            return
+
+        (rejected_time, response_text) = self.rejected_symbols[symbol]
+        if time.time() - rejected_time < REJECTED_SYMBOL_RETRY:
+            raise Exception(f'{symbol} was rejected by binance, response: {response_text}')
+        del self.rejected_symbols[symbol]
+
+    def _get_batch_symbols(self) -> set:
+        now = time.time()
+        for (symbol, (rejected_time, _)) in list(self.rejected_symbols.items()):
+            if now - rejected_time >= REJECTED_SYMBOL_RETRY:
+                del self.rejected_symbols[symbol]
+        return self.symbols - set(self.rejected_symbols)
+
+    def _fetch_tickers(self, path, description) -> list:
+        """ Returns the tickers of <path> for the tracked symbols that binance accepts """
+        symbols = self._get_batch_symbols()
+        if len(symbols) == 0:
+            return []
+
+        response = trader.binance.client.default_client.get(path, _symbols_param(symbols))
+        if response.status_code == 200:
+            return response.json()
+
+        if not _is_invalid_symbol(response):
+            raise Exception(f'Failed while fetching the {description}, response: {response.text}')
+
+        # Find the rejected symbols one by one
+        tickers = []
+        for symbol in sorted(symbols):
+            response = trader.binance.client.default_client.get(path, f'symbol={symbol}')
+            if response.status_code == 200:
+                tickers.append(response.json())
+            elif _is_invalid_symbol(response):
+                self.rejected_symbols[symbol] = (time.time(), response.text)
+            else:
+                raise Exception(f'Failed while fetching the {description} of {symbol}, response: {response.text}')
+
+        return tickers
+
+    def _refresh_prices(self):
+        tickers = self._fetch_tickers('/api/v3/ticker/price', 'price snapshot')
+
+        now = time.time()
+        for ticker in tickers:
+            self.prices[ticker['symbol']] = float(ticker['price'])
+            self.price_times[ticker['symbol']] = now
+
+    def _refresh_statistics(self):
+        if len(self.symbols) == 0:
+            return
+
+        tickers = self._fetch_tickers('/api/v3/ticker/24hr', '24hr statistics snapshot')
+
+        self.statistics = {statistics['symbol']: statistics for statistics in tickers}
+        self.statistics_time = time.time()
+
+
+# Shared by the bot and the helper functions
+market_snapshot = MarketSnapshot()
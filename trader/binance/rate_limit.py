@@ -0,0 +1,213 @@
+"""
+    Request weight limits of the binance api
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+# Seconds the used weight is counted over
+WEIGHT_WINDOW = 60
+
+# Request weight allowed per WEIGHT_WINDOW, binance allows 6000
+# but some of it is left for the other requests from the same IP
+DEFAULT_WEIGHT_LIMIT = 3000
+
+
+class WeightLimiter:
+    """
+        Blocks the callers until sending a request of the given weight keeps
+        the weight used in the last WEIGHT_WINDOW seconds under <weight_limit>
+    """
+
+    def __init__(self, weight_limit = DEFAULT_WEIGHT_LIMIT):
+        self.weight_limit = weight_limit
+        # (time, weight) of every request in the window
+        self._requests = deque()
+        self._used_weight = 0
+        self._condition = threading.Condition()
+
+    def _expire(self, now):
+        while len(self._requests) > 0 and now - self._requests[0][0] >= WEIGHT_WINDOW:
+            self._used_weight -= self._requests.popleft()[1]
+
+    @property
+    def used_weight(self) -> int:
+        with self._condition:
+            self._expire(time.monotonic())
+            return self._used_weight
+
+    def acquire(self, weight):
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+
+                if self._used_weight + weight <= self.weight_limit or len(self._requests) == 0:
+                    self._requests.append((now, weight))
+                    self._used_weight += weight
+                    return
+
+                # Wait until the oldest request leaves the window
+                self._condition.wait(WEIGHT_WINDOW - (now - self._requests[0][0]))
+
+
+# Request weight binance allows per minute and IP
+REQUEST_WEIGHT_LIMIT = 6000
+
+# Request weights of the endpoints, the ones that depend on the params are in get_request_weight
+ENDPOINT_WEIGHTS = {
+    '/api/v3/time': 1,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/klines': 2,
+    '/api/v3/account': 20,
+    '/api/v3/order': 1,
+}
+
+# Orders and the account must not wait behind the market data
+PRIORITY_HIGH = 0
+# Prices, statistics, server time and exchange info
+PRIORITY_NORMAL = 1
+# Kline refreshes of the indicators and the downloads
+PRIORITY_LOW = 2
+
+ENDPOINT_PRIORITIES = {
+    '/api/v3/order': PRIORITY_HIGH,
+    '/api/v3/account': PRIORITY_HIGH,
+    '/api/v3/klines': PRIORITY_LOW,
+}
+
+# Share of the weight limit the requests of a priority can use, the rest is kept for the higher ones
+PRIORITY_WEIGHT_SHARES = {
+    PRIORITY_HIGH: 1.0,
+    PRIORITY_NORMAL: 0.9,
+    PRIORITY_LOW: 0.8,
+}
+
+# Seconds to back off on a 429 or 418 without a Retry-After header, doubled on every repeat
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 300.0
+
+
+def get_request_weight(path, params = '') -> int:
+    if path in ENDPOINT_WEIGHTS:
+        return ENDPOINT_WEIGHTS[path]
+
+    if path == '/api/v3/ticker/price':
+        return 2 if params.startswith('symbol=') or '&symbol=' in params else 4
+
+    if path == '/api/v3/ticker/24hr':
+        if params.startswith('symbol=') or '&symbol=' in params:
+            return 2
+        if 'symbols=' not in params:
+            return 80
+        # The symbols param is an url encoded JSON list
+        symbol_count = params.count('%2C') + params.count(',') + 1
+        return 2 if symbol_count <= 20 else 40 if symbol_count <= 100 else 80
+
+    return 1
+
+
+def get_priority(path) -> int:
+    return ENDPOINT_PRIORITIES.get(path, PRIORITY_NORMAL)
+
+
+class RequestScheduler(WeightLimiter):
+    """
+        Orders the requests of a client by priority under the weight limit.
+
+        The used weight is the larger of the weight sent in the last minute and
+        the X-MBX-USED-WEIGHT-1M the server reported in the current minute, so
+        the requests of the other processes on the same IP are counted too.
+        A 429 or 418 response holds every request until its Retry-After.
+    """
+
+    def __init__(self, weight_limit = REQUEST_WEIGHT_LIMIT):
+        super().__init__(weight_limit)
+        # Heap of the (priority, sequence) tickets of the waiting requests
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._reported_weight = 0
+        self._reported_minute = None
+        self._blocked_until = 0.0
+        self._backoff_count = 0
+
+    def _get_used_weight(self) -> int:
+        if self._reported_minute == int(time.time() // 60):
+            return max(self._used_weight, self._reported_weight)
+        return self._used_weight
+
+    @property
+    def used_weight(self) -> int:
+        with self._condition:
+            self._expire(time.monotonic())
+            return self._get_used_weight()
+
+    @property
+    def blocked_for(self) -> float:
+        """ Seconds left of the back off after a 429 or 418 """
+        with self._condition:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def _get_wait_time(self, ticket, weight, now):
+        """ 0 if the request of <ticket> can be sent now, else the seconds to wait, None until notified """
+        if self._blocked_until > now:
+            return self._blocked_until - now
+
+        if self._waiting[0] != ticket:
+            return None
+
+        limit = self.weight_limit * PRIORITY_WEIGHT_SHARES[ticket[0]]
+        used_weight = self._get_used_weight()
+        if used_weight + weight <= limit or (len(self._requests) == 0 and used_weight == self._used_weight):
+            return 0
+
+        # Either the oldest request leaves the window or the reported weight resets with the minute
+        wait_time = 60 - time.time() % 60
+        if len(self._requests) > 0:
+            wait_time = min(wait_time, WEIGHT_WINDOW - (now - self._requests[0][0]))
+        return max(wait_time, 0.001)
+
+    def acquire(self, weight, priority = PRIORITY_NORMAL):
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._expire(now)
+                    wait_time = self._get_wait_time(ticket, weight, now)
+                    if wait_time == 0:
+                        break
+                    self._condition.wait(wait_time)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                # The next ticket might be sendable now
+                self._condition.notify_all()
+
+            self._requests.append((now, weight))
+            self._used_weight += weight
+
+    def update(self, response):
+        """ Read the used weight and the back off of a response """
+        used_weight = response.headers.get('X-MBX-USED-WEIGHT-1M')
+        retry_after = response.headers.get('Retry-After')
+
+        with self._condition:
+            if used_weight is not None:
+                self._reported_weight = int(used_weight)
+                self._reported_minute = int(time.time() // 60)
+
+            if response.status_code in (429, 418):
+                if retry_after is not None:
+                    backoff = float(retry_after)
+                else:
+                    backoff = min(DEFAULT_BACKOFF * 2 ** self._backoff_count, MAX_BACKOFF)
+                self._blocked_until = max(self._blocked_until, time.monotonic() + backoff)
+                self._backoff_count += 1
+            else:
+                self._backoff_count = 0
+
+            self._condition.notify_all()
@@ -0,0 +1,162 @@
+"""
+    Record and replay of the binance api traffic.
+
+    A recording is a gzip compressed file of JSON lines, one line per request;
+        {"t": seconds since the start, "d": seconds the request took,
+         "m": method, "p": path, "q": params, "s": status code,
+         "h": rate limit headers, "b": response body}
+"""
+import atexit
+import gzip
+import json
+import threading
+import time
+import urllib.parse
+from collections import deque
+
+import requests
+import requests.structures
+
+RECORDING_VERSION = 1
+
+# Params that change on every signed request, they are not used while matching
+VOLATILE_PARAMS = ('timestamp', 'recvWindow', 'signature')
+
+# Records written between two flushes of the compressed stream
+FLUSH_INTERVAL = 64
+
+
+def request_key(method, path, params) -> str:
+    """ Identifies the same request across a recording and its replay """
+    kept = [(key, value) for (key, value) in urllib.parse.parse_qsl(params, keep_blank_values = True) if key not in VOLATILE_PARAMS]
+    return f'{method} {path}?{urllib.parse.urlencode(kept)}'
+
+
+def _recorded_headers(headers) -> dict:
+    return {key: value for (key, value) in headers.items() if key.lower().startswith('x-mbx-') or key.lower() == 'retry-after'}
+
+
+class ReplayError(Exception):
+    """ The replayed code sent a request that is not in the recording """
+
+
+class Recorder:
+    """
+        Appends every request and response of a BinanceClient to <path>
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.start_time = time.monotonic()
+        self._file = gzip.open(path, 'wt', encoding = 'utf-8')
+        self._count = 0
+        self._lock = threading.Lock()
+
+        self._write({'version': RECORDING_VERSION, 'start': time.time()})
+        atexit.register(self.close)
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators = (',', ':')) + '\n')
+
+    def record(self, method, path, params, response, started, duration):
+        """ <started> is the time.monotonic() the request was sent at """
+        entry = {
+            't': round(started - self.start_time, 6),
+            'd': round(duration, 6),
+            'm': method,
+            'p': path,
+            'q': params,
+            's': response.status_code,
+            'h': _recorded_headers(response.headers),
+            'b': response.text,
+        }
+
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._write(entry)
+            self._count += 1
+            if self._count % FLUSH_INTERVAL == 0:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class Replayer:
+    """
+        Serves the responses of a recording in place of the exchange.
+
+        The responses of the same request are served in the recorded order,
+        once they run out a GET request keeps getting its last response and any
+        other request raises ReplayError. With <realtime> every response is
+        delayed by the time the recorded request took, otherwise it is
+        returned as fast as possible.
+    """
+
+    def __init__(self, path, realtime = False):
+        self.path = path
+        self.realtime = realtime
+        self._responses = {}
+        self._last_responses = {}
+        self._remaining = 0
+        self._lock = threading.Lock()
+
+        with gzip.open(path, 'rt', encoding = 'utf-8') as recording_file:
+            header = json.loads(recording_file.readline())
+            if header.get('version') != RECORDING_VERSION:
+                raise Exception(f'{path} is not a version {RECORDING_VERSION} recording')
+
+            for entry in _read_entries(recording_file):
+                self._responses.setdefault(request_key(entry['m'], entry['p'], entry['q']), deque()).append(entry)
+                self._remaining += 1
+
+    @property
+    def remaining(self) -> int:
+        """ Number of recorded responses that were not served yet """
+        with self._lock:
+            return self._remaining
+
+    def replay(self, method, path, params) -> requests.Response:
+        key = request_key(method, path, params)
+
+        with self._lock:
+            responses = self._responses.get(key)
+            if responses:
+                entry = responses.popleft()
+                self._last_responses[key] = entry
+                self._remaining -= 1
+            elif method == 'GET' and key in self._last_responses:
+                entry = self._last_responses[key]
+            else:
+                raise ReplayError(f'{key} is not in the recording {self.path}')
+
+        if self.realtime:
+            time.sleep(entry['d'])
+
+        return _to_response(entry, key)
+
+
+def _read_entries(recording_file):
+    """
+        Yields the recorded entries, a recording of a killed process ends
+        after its last flush so the truncated tail is skipped
+    """
+    try:
+        for line in recording_file:
+            yield json.loads(line)
+    except (EOFError, ValueError):
+        return
+
+
+def _to_response(entry, url) -> requests.Response:
+    response = requests.Response()
+    response.status_code = entry['s']
+    response.headers = requests.structures.CaseInsensitiveDict(entry['h'])
+    response._content = entry['b'].encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = url
+    return response
@@ -0,0 +1,146 @@
+"""
+    Streaming market data over the binance websocket api
+"""
+import json
+import threading
+import time
+
+import websockets.sync.client
+
+import trader.binance.klines
+import trader.binance.market
+import trader.constants
+
+# The stream is considered dead if no message arrives for this many seconds
+STREAM_STALE_AFTER = 30
+
+# Seconds to wait before reconnecting, doubled after every failed attempt
+STREAM_RECONNECT_DELAY = 1
+STREAM_MAX_RECONNECT_DELAY = 60
+
+
+def kline_event_to_kline(event_kline) -> list:
+    """ Convert the `k` field of a kline event into the REST kline format """
+    return [
+        int(event_kline['t']),
+        event_kline['o'],
+        event_kline['h'],
+        event_kline['l'],
+        event_kline['c'],
+        event_kline['v'],
+        int(event_kline['T']),
+        event_kline['q'],
+        int(event_kline['n']),
+        event_kline['V'],
+        event_kline['Q'],
+        '0',
+    ]
+
+
+class MarketStream:
+    """
+        Subscribes to the combined kline and miniTicker streams of <symbols>.
+
+        The received prices go into the shared market snapshot and the candles
+        into the shared kline windows, so the indicator functions read them
+        without any request. After every (re)connect the windows and the prices
+        are backfilled over REST, while the stream is down is_healthy returns
+        False and the callers keep polling REST.
+
+        Every pushed price or candle marks its symbol as changed,
+        wait_for_changes blocks until there is one so the callers evaluate
+        a symbol as soon as it moves.
+    """
+
+    def __init__(self, symbols, intervals, base_endpoint = None):
+        self.symbols = list(symbols)
+        self.intervals = list(intervals)
+        self.base_endpoint = base_endpoint if base_endpoint is not None else trader.constants.STREAM_BASE_ENDPOINT
+        self.last_message_time = None
+        self.connected = False
+        self.on_error = None
+        self._thread = None
+        self._changed_symbols = set()
+        self._changed = threading.Condition()
+
+    @property
+    def url(self) -> str:
+        streams = []
+        for symbol in self.symbols:
+            streams.append(f'{symbol.lower()}@miniTicker')
+            for interval in self.intervals:
+                streams.append(f'{symbol.lower()}@kline_{interval}')
+        return f'{self.base_endpoint}/stream?streams={"/".join(streams)}'
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(target = self._run, name = 'market-stream')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_healthy(self) -> bool:
+        if not self.connected or self.last_message_time is None:
+            return False
+        return time.time() - self.last_message_time < STREAM_STALE_AFTER
+
+    def handle_message(self, message):
+        """ Apply a single combined stream message """
+        data = json.loads(message).get('data', {})
+        event_type = data.get('e')
+
+        if event_type == '24hrMiniTicker':
+            price = float(data['c'])
+            trader.binance.market.market_snapshot.set_price(data['s'], price)
+            trader.binance.klines.update_last_price(data['s'], price)
+            self._mark_changed([data['s']])
+        elif event_type == 'kline':
+            event_kline = data['k']
+            window = trader.binance.klines.get_cached_window(data['s'], event_kline['i'])
+            if window is not None:
+                window.merge(kline_event_to_kline(event_kline))
+                self._mark_changed([data['s']])
+
+        self.last_message_time = time.time()
+
+    def wait_for_changes(self, timeout) -> set:
+        """ Returns the symbols changed since the previous call, waits up to <timeout> seconds for one """
+        with self._changed:
+            self._changed.wait_for(lambda: len(self._changed_symbols) > 0, timeout)
+            changed_symbols = self._changed_symbols
+            self._changed_symbols = set()
+        return changed_symbols
+
+    def _mark_changed(self, symbols):
+        with self._changed:
+            self._changed_symbols.update(symbols)
+            self._changed.notify_all()
+
+    def backfill(self):
+        """ Catch up with everything that happened while the stream was down """
+        trader.binance.market.market_snapshot.refresh_prices()
+        for symbol in self.symbols:
+            for interval in self.intervals:
+                window = trader.binance.klines.get_cached_window(symbol, interval)
+                if window is not None:
+                    window.refresh()
+        self._mark_changed(self.symbols)
+
+    def _run(self):
+        delay = STREAM_RECONNECT_DELAY
+        while True:
+            try:
+                with websockets.sync.client.connect(self.url) as websocket:
+                    self.backfill()
+                    self.connected = True
+                    delay = STREAM_RECONNECT_DELAY
+                    while True:
+                        self.handle_message(websocket.recv(timeout = STREAM_STALE_AFTER))
+            except Exception as ex:
+                self.connected = False
+                if self.on_error is not None:
+                    self.on_error(ex)
+
+            time.sleep(delay)
+            delay = min(delay * 2, STREAM_MAX_RECONNECT_DELAY)
@@ -1,5 +1,13 @@
-BASE_ENDPOINT = 'https://api2.binance.com'
+import os
+
+# Both can be pointed at a local stand-in, e.g. experimental/exchange_stand_in.py
+BASE_ENDPOINT = os.environ.get('BINANCE_BASE_ENDPOINT', 'https://api2.binance.com')
+STREAM_BASE_ENDPOINT = os.environ.get('BINANCE_STREAM_BASE_ENDPOINT', 'wss://stream.binance.com:9443')
 BINANCE_API_KEYS_FILE = 'binance_api_keys.json'
+# Milliseconds a signed request stays valid after its timestamp
+RECV_WINDOW = 5000
+# Directory of the local candle archive
+CANDLE_STORE_DIRECTORY = 'candles'
 
 TELEGRAM_BOT_API_BASE_ENDPOINT = 'https://api.telegram.org/bot'
 TELEGRAM_BOT_API_KEYS_FILE = 'telegram_bot_api_keys.json'
@@ -1,8 +1,19 @@
 import os
 import json
 import datetime
+import threading
 import requests
 import trader.constants
+import trader.metrics
+
+# Keeps the lines of the concurrent log writes apart
+_log_lock = threading.Lock()
+
+NOTIFICATION_DURATION = trader.metrics.registry.histogram(
+    'notification_duration_seconds',
+    'Duration of the telegram and discord notifications.',
+    ['service'],
+)
 
 def fill_empty_fields_with_default_config(current_config, default_config) -> dict:
     if current_config['base_currency'] and current_config['target_currency']:
@@ -69,8 +80,9 @@ def validate_config_file(config, expected_config_keys):
 def log(filename, message, dump_to_console):
     date = datetime.datetime.now().strftime('%Y.%m.%d - %H:%M:%S')
     log_message = f'{date} --- {message}'
-    with open(filename, 'a') as log_file:
-        log_file.write(f'{log_message}\n')
+    with _log_lock:
+        with open(filename, 'a') as log_file:
+            log_file.write(f'{log_message}\n')
     if dump_to_console:
         print(message)
 
@@ -84,8 +96,9 @@ def notify_on_telegram(api_token, chat_id, message):
     """
 
     # Send the message
-    response = requests.get(f'{trader.constants.TELEGRAM_BOT_API_BASE_ENDPOINT}{api_token}/sendMessage'
-        f'?chat_id={chat_id}&text={message}')
+    with NOTIFICATION_DURATION.time('telegram'):
+        response = requests.get(f'{trader.constants.TELEGRAM_BOT_API_BASE_ENDPOINT}{api_token}/sendMessage'
+            f'?chat_id={chat_id}&text={message}')
     
     response_json = response.json()
     if response.status_code != 200:
@@ -112,8 +125,9 @@ def notify_on_discord(api_token, channel_id, message):
     }
 
     # Send the message
-    response = requests.post(f'{trader.constants.DISCORD_BOT_API_BASE_ENDPOINT}'
-        f'/channels/{channel_id}/messages', headers = headers, json = data)
+    with NOTIFICATION_DURATION.time('discord'):
+        response = requests.post(f'{trader.constants.DISCORD_BOT_API_BASE_ENDPOINT}'
+            f'/channels/{channel_id}/messages', headers = headers, json = data)
 
     response_json = response.json()
     if response.status_code != 200:
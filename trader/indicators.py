@@ -1,3 +1,4 @@
+from collections import deque
 from typing import Tuple
 
 def get_rsi(data_points, moving_average = 0) -> float:
@@ -97,3 +98,242 @@ def get_ema(data_points) -> float:
         ema = a * data_points[index] + (1 - a) * ema
 
     return ema
+
+
+class RollingIndicator:
+    """
+        Base of the incremental indicators that hold the latest <size> data points.
+
+        update(value) appends a closed data point, replace_last(value) moves the
+        forming one, both are O(1). The running sums are rebuilt from the window
+        every <size> changes to keep the floating point error bounded.
+    """
+
+    def __init__(self, size):
+        if size <= 0:
+            raise Exception(f'size must be a positive integer, it was {size}')
+
+        self.size = size
+        self.data_points = deque(maxlen = size)
+        self._updates_since_rebuild = 0
+
+    def update(self, value):
+        value = float(value)
+        if len(self.data_points) < self.size:
+            self.data_points.append(value)
+            self._rebuild()
+            return
+
+        self._slide(value)
+        self.data_points.append(value)
+
+        self._count_change()
+
+    def replace_last(self, value):
+        value = float(value)
+        if len(self.data_points) == 0:
+            self.update(value)
+            return
+
+        self._replace_last(value)
+        self.data_points[-1] = value
+
+        # The forming data point can move thousands of times before it closes
+        self._count_change()
+
+    def _count_change(self):
+        self._updates_since_rebuild += 1
+        if self._updates_since_rebuild >= self.size:
+            self._rebuild()
+
+    def _rebuild(self):
+        raise NotImplementedError
+
+    def _slide(self, value):
+        """ Called before <value> is appended and data_points[0] is dropped """
+        raise NotImplementedError
+
+    def _replace_last(self, value):
+        """ Called before data_points[-1] is replaced with <value> """
+        raise NotImplementedError
+
+
+class RollingSMA(RollingIndicator):
+    """
+        Incremental get_sma over the latest <size> data points
+    """
+
+    def _rebuild(self):
+        self._total = sum(self.data_points)
+        self._updates_since_rebuild = 0
+
+    def _slide(self, value):
+        self._total += value - self.data_points[0]
+
+    def _replace_last(self, value):
+        self._total += value - self.data_points[-1]
+
+    @property
+    def value(self) -> float:
+        return self._total / len(self.data_points)
+
+
+class RollingEMA(RollingIndicator):
+    """
+        Incremental get_ema over the latest <size> data points.
+
+        get_ema seeds with the average of the window and smooths every point
+        after the first one, so the result is
+        (1 - a)^(n - 1) * average + a * sum((1 - a)^(n - 1 - k) * data_points[k]), k >= 1
+        and both sums can be slid along the window.
+    """
+
+    def _rebuild(self):
+        count = len(self.data_points)
+        self._alpha = 2 / (count + 1)
+        self._ratio = 1 - self._alpha
+        self._oldest_weight = self._ratio ** (count - 1)
+        self._total = sum(self.data_points)
+        self._weighted_total = 0.0
+        for index in range(1, count):
+            self._weighted_total = self._ratio * self._weighted_total + self.data_points[index]
+        self._updates_since_rebuild = 0
+
+    def _slide(self, value):
+        self._total += value - self.data_points[0]
+        if self.size > 1:
+            self._weighted_total = self._ratio * self._weighted_total - self._oldest_weight * self.data_points[1] + value
+
+    def _replace_last(self, value):
+        self._total += value - self.data_points[-1]
+        if len(self.data_points) > 1:
+            self._weighted_total += value - self.data_points[-1]
+
+    @property
+    def value(self) -> float:
+        average = self._total / len(self.data_points)
+        return self._oldest_weight * average + self._alpha * self._weighted_total
+
+
+class RollingRSI(RollingIndicator):
+    """
+        Incremental get_rsi over the latest <size> data points.
+
+        moving_average
+            0 - SMA (Simple Moving Average)
+            1 - EMA (Exponential Moving Average)
+
+        Unlike get_rsi, a window without any downward change returns 100
+        instead of dividing by zero.
+    """
+
+    def __init__(self, size, moving_average = 0):
+        if moving_average not in (0, 1):
+            raise Exception(f'<{moving_average}> is not valid for moving average parameter')
+
+        self.moving_average = moving_average
+        # (up, down) change between each pair of consecutive data points
+        self.changes = deque(maxlen = max(size - 1, 1))
+        super().__init__(size)
+
+    @staticmethod
+    def _change(prev_value, value):
+        diff = value - prev_value
+        if diff > 0:
+            return (diff, 0.0)
+        return (0.0, -diff)
+
+    def _rebuild(self):
+        self.changes.clear()
+        for index in range(1, len(self.data_points)):
+            self.changes.append(self._change(self.data_points[index - 1], self.data_points[index]))
+
+        count = len(self.changes)
+        self._alpha = 2 / (len(self.data_points) + 1)
+        self._ratio = 1 - self._alpha
+        self._oldest_weight = self._ratio ** count
+        self._up_total = sum(change[0] for change in self.changes)
+        self._down_total = sum(change[1] for change in self.changes)
+        self._weighted_up = 0.0
+        self._weighted_down = 0.0
+        for (up, down) in self.changes:
+            self._weighted_up = self._ratio * self._weighted_up + up
+            self._weighted_down = self._ratio * self._weighted_down + down
+        self._updates_since_rebuild = 0
+
+    def _slide(self, value):
+        if self.size == 1:
+            return
+
+        (oldest_up, oldest_down) = self.changes[0]
+        (up, down) = self._change(self.data_points[-1], value)
+        self.changes.append((up, down))
+
+        self._up_total += up - oldest_up
+        self._down_total += down - oldest_down
+        self._weighted_up = self._ratio * self._weighted_up - self._oldest_weight * oldest_up + up
+        self._weighted_down = self._ratio * self._weighted_down - self._oldest_weight * oldest_down + down
+
+    def _replace_last(self, value):
+        if len(self.changes) == 0:
+            return
+
+        (prev_up, prev_down) = self.changes[-1]
+        (up, down) = self._change(self.data_points[-2], value)
+        self.changes[-1] = (up, down)
+
+        self._up_total += up - prev_up
+        self._down_total += down - prev_down
+        self._weighted_up += up - prev_up
+        self._weighted_down += down - prev_down
+
+    @property
+    def value(self) -> float:
+        count = len(self.changes)
+        if count == 0:
+            return 0
+
+        up_avg = self._up_total / count
+        down_avg = self._down_total / count
+
+        if self.moving_average == 1:
+            up_avg = self._oldest_weight * up_avg + self._alpha * self._weighted_up
+            down_avg = self._oldest_weight * down_avg + self._alpha * self._weighted_down
+
+        if down_avg == 0:
+            return 100
+
+        rs = up_avg / down_avg
+        return 100 - (100 / (1 + rs))
+
+
+class RollingBollinger(RollingIndicator):
+    """
+        Incremental get_bollinger_bands over the latest <size> data points,
+        the variance is kept with Welford's algorithm
+    """
+
+    def _rebuild(self):
+        count = len(self.data_points)
+        self._mean = sum(self.data_points) / count
+        self._squared_total = sum((data_point - self._mean) ** 2 for data_point in self.data_points)
+        self._updates_since_rebuild = 0
+
+    def _slide(self, value):
+        self._replace(self.data_points[0], value)
+
+    def _replace_last(self, value):
+        self._replace(self.data_points[-1], value)
+
+    def _replace(self, old_value, value):
+        """ Swap <old_value> with <value> while the count stays the same """
+        diff = value - old_value
+        new_mean = self._mean + diff / len(self.data_points)
+        self._squared_total += diff * (value - new_mean + old_value - self._mean)
+        self._mean = new_mean
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        """ Returns (upper, middle, lower) bollinger bands """
+        deviation = (max(self._squared_total, 0.0) / len(self.data_points)) ** (1 / 2)
+        return (self._mean + (2 * deviation), self._mean, self._mean - (2 * deviation))
@@ -0,0 +1,110 @@
+"""
+    Readers of the log files written by trader.helper.log.
+
+    A line is "<date> --- <message>". The bots keep appending to their logs,
+    the latest lines are read by seeking back from the end of the file block
+    by block, so the cost depends on the number of lines asked for instead of
+    the size of the file.
+"""
+import os
+import re
+from typing import Iterator, Optional, Tuple
+
+# Bytes read at once while seeking back from the end of a file
+BLOCK_SIZE = 8192
+
+LOG_SEPARATOR = ' --- '
+
+# Bought <quantity> <base> for <target amount> <target> ( <symbol> -> <price> )
+TRADE_PATTERN = re.compile(
+    r'^(?P<side>Bought|Sold) (?P<quantity>\S+) (?P<base_currency>\S+) for (?P<quote_quantity>\S+) (?P<target_currency>\S+)'
+    r'(?: \( (?P<symbol>\S+) -> (?P<price>\S+) \))?'
+)
+
+
+def reverse_lines(path, block_size = BLOCK_SIZE) -> Iterator[str]:
+    """ Yields the lines of <path> from the last one to the first one, without their line breaks """
+    with open(path, 'rb') as log_file:
+        position = log_file.seek(0, os.SEEK_END)
+        # The part of a line that started before the block that was read last
+        remainder = b''
+        is_last_line = True
+
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            log_file.seek(position)
+            lines = (log_file.read(size) + remainder).split(b'\n')
+
+            # The first line may go on in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                # The file ends with a line break, there is no line after it
+                if is_last_line and line == b'':
+                    is_last_line = False
+                    continue
+                is_last_line = False
+                yield line.decode('utf-8', errors = 'replace')
+
+        if remainder != b'' or not is_last_line:
+            yield remainder.decode('utf-8', errors = 'replace')
+
+
+def read_last_lines(path, count, block_size = BLOCK_SIZE) -> list:
+    """ Returns the last <count> lines of <path>, oldest first """
+    lines = []
+    if count <= 0:
+        return lines
+
+    for line in reverse_lines(path, block_size):
+        lines.append(line)
+        if len(lines) == count:
+            break
+
+    lines.reverse()
+    return lines
+
+
+def parse_line(line) -> Optional[Tuple[str, str]]:
+    """ Returns (date, message) of a log line, None if it is not one """
+    if LOG_SEPARATOR not in line:
+        return None
+
+    (date, message) = line.split(LOG_SEPARATOR, 1)
+    return (date.strip(), message.strip())
+
+
+def read_entries(path, count = None) -> list:
+    """ Returns the (date, message) of the last <count> entries of <path>, or of every entry """
+    if count is None:
+        with open(path, 'r', encoding = 'utf-8', errors = 'replace') as log_file:
+            lines = log_file.read().splitlines()
+    else:
+        lines = read_last_lines(path, count)
+
+    entries = [parse_line(line) for line in lines]
+    return [entry for entry in entries if entry is not None]
+
+
+def parse_trade(message) -> Optional[dict]:
+    """
+        Returns {'side', 'quantity', 'base_currency', 'quote_quantity',
+        'target_currency', 'symbol', 'price'} of a Bought or Sold message,
+        None for the other messages
+    """
+    match = TRADE_PATTERN.match(message)
+    if match is None:
+        return None
+
+    trade = match.groupdict()
+    try:
+        trade['quantity'] = float(trade['quantity'])
+        trade['quote_quantity'] = float(trade['quote_quantity'])
+        trade['price'] = float(trade['price']) if trade['price'] is not None else None
+    except ValueError:
+        return None
+
+    trade['side'] = 'BUY' if trade['side'] == 'Bought' else 'SELL'
+    if trade['symbol'] is None:
+        trade['symbol'] = trade['base_currency'] + trade['target_currency']
+    return trade
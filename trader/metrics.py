@@ -0,0 +1,151 @@
+"""
+    Latency histograms exported in the Prometheus text format.
+
+    The histograms are defined next to the code they time;
+        REQUEST_DURATION = trader.metrics.registry.histogram('name_seconds', 'Help text', ['label'])
+
+        with REQUEST_DURATION.time('label value'):
+            ...
+
+    An observation is a bisect and two increments under a lock, cheap enough
+    to stay enabled in production.
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds, from the indicator computations to the slow requests
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# The endpoint is only reachable from the same machine unless a host is given
+DEFAULT_HOST = '127.0.0.1'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra = '') -> str:
+    labels = [f'{name}="{_escape(value)}"' for (name, value) in zip(names, values)]
+    if extra:
+        labels.append(extra)
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+class _Timer:
+    __slots__ = ('histogram', 'label_values', 'start')
+
+    def __init__(self, histogram, label_values):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+
+
+class Histogram:
+    """
+        Counts of the observed values in <buckets>, one set of counts
+        for every combination of the <label_names> values
+    """
+
+    def __init__(self, name, help_text, label_names = (), buckets = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *label_values) -> _Timer:
+        """ Context manager that observes the seconds its block took """
+        return _Timer(self, label_values)
+
+    def render(self) -> list:
+        with self._lock:
+            series = {label_values: list(counts) for (label_values, counts) in self._series.items()}
+
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for (label_values, counts) in sorted(series.items()):
+            cumulative = 0
+            for (bound, count) in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                bucket_labels = _format_labels(self.label_names, label_values, 'le="' + str(bound) + '"')
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.label_names, label_values)} {counts[-1]}')
+            lines.append(f'{self.name}_count{_format_labels(self.label_names, label_values)} {cumulative}')
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text, label_names = (), buckets = DEFAULT_BUCKETS) -> Histogram:
+        """ Returns the histogram called <name>, it is created on the first call """
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, help_text, label_names, buckets)
+            return self._histograms[name]
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = list(self._histograms.values())
+
+        lines = []
+        for histogram in histograms:
+            lines += histogram.render()
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        data = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port, host = DEFAULT_HOST, metrics_registry = None) -> ThreadingHTTPServer:
+    """ Serve <metrics_registry> on http://<host>:<port>/metrics from a daemon thread """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.registry = metrics_registry if metrics_registry is not None else registry
+
+    thread = threading.Thread(target = server.serve_forever, name = 'metrics-server')
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+# Shared by every module that is timed
+registry = Registry()
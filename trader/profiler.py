@@ -0,0 +1,195 @@
+"""
+    Sampling profiler of every thread of the process.
+
+    A background thread reads the stack of the other threads every <interval>
+    seconds. A sample is weighted by the CPU time its thread used since the
+    previous sample, so the threads that sleep or wait on the network weigh
+    nothing and the CPU use of the TUI draw thread and of the trading threads
+    is reported apart. Without per thread CPU clocks (non Linux hosts), the
+    samples are weighted by the wall clock time instead.
+
+    The samples are written as;
+        <prefix>.collapsed          one "thread;frame;...;frame microseconds" line per
+                                    stack, the input of flamegraph.pl or speedscope
+        <prefix>.pstats             pstats file of every thread, "ncalls" are sample counts
+        <prefix>.<thread>.pstats    pstats file of a single thread group
+        <prefix>.summary.txt        CPU seconds per thread group
+"""
+import collections
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+
+# Seconds between two samples
+SAMPLE_INTERVAL = 0.005
+
+
+def get_thread_group(name) -> str:
+    """ Threads of the same pool, e.g. ssb-worker_0 and ssb-worker_1, are reported together """
+    return re.sub(r'[_-]\d+$', '', name).replace(';', '_').replace(' ', '_')
+
+
+def _frame_label(function) -> str:
+    (filename, line, name) = function
+    # The files of the bot relative to the working directory, the libraries in full
+    if os.path.isabs(filename) and filename.startswith(os.getcwd() + os.sep):
+        filename = os.path.relpath(filename)
+    return f'{name} ({filename}:{line})'
+
+
+class SamplingProfiler:
+
+    def __init__(self, interval = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.uses_cpu_time = hasattr(time, 'pthread_getcpuclockid')
+        self.start_time = None
+        self.stop_time = None
+        # (thread group, (function, ...) from the outermost frame) -> seconds
+        self.samples = collections.Counter()
+        # (thread group, (function, ...)) -> number of samples
+        self.sample_counts = collections.Counter()
+        self._cpu_times = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.start_time = time.time()
+        for thread in threading.enumerate():
+            self._cpu_delta(thread.ident)
+
+        self._thread = threading.Thread(target = self._run, name = 'profiler')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.stop_time = time.time()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def _cpu_delta(self, ident) -> float:
+        """ CPU seconds thread <ident> used since the previous call """
+        try:
+            cpu_time = time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, ProcessLookupError):
+            # The thread exited since the frames were read
+            return 0.0
+
+        delta = cpu_time - self._cpu_times.get(ident, 0.0)
+        self._cpu_times[ident] = cpu_time
+        return delta
+
+    def _sample(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_ident = threading.get_ident()
+
+        for (ident, frame) in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+
+            weight = self._cpu_delta(ident) if self.uses_cpu_time else self.interval
+            if weight <= 0:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            stack.reverse()
+
+            key = (get_thread_group(names.get(ident, str(ident))), tuple(stack))
+            self.samples[key] += weight
+            self.sample_counts[key] += 1
+
+    def get_thread_times(self) -> dict:
+        """ Returns {thread group: seconds} """
+        thread_times = collections.Counter()
+        for ((group, _), seconds) in self.samples.items():
+            thread_times[group] += seconds
+        return dict(thread_times)
+
+    def get_pstats(self, group = None) -> dict:
+        """
+            The samples of <group>, or of every thread, in the format of the
+            pstats.Stats.stats dict;
+                function -> (primitive calls, calls, total time, cumulative time, callers)
+        """
+        calls = collections.Counter()
+        total_times = collections.Counter()
+        cumulative_times = collections.Counter()
+        # function -> caller -> [calls, calls, total time, cumulative time]
+        callers = collections.defaultdict(lambda: collections.defaultdict(lambda: [0, 0, 0.0, 0.0]))
+
+        for ((thread_group, stack), seconds) in self.samples.items():
+            if group is not None and thread_group != group:
+                continue
+
+            count = self.sample_counts[(thread_group, stack)]
+            total_times[stack[-1]] += seconds
+
+            # Recursive functions are counted once per sample
+            seen = set()
+            for (index, function) in enumerate(stack):
+                if function in seen:
+                    continue
+                seen.add(function)
+                calls[function] += count
+                cumulative_times[function] += seconds
+
+                if index > 0:
+                    edge = callers[function][stack[index - 1]]
+                    edge[0] += count
+                    edge[1] += count
+                    edge[3] += seconds
+                    if index == len(stack) - 1:
+                        edge[2] += seconds
+
+        return {
+            function: (
+                calls[function],
+                calls[function],
+                total_times[function],
+                cumulative_times[function],
+                {caller: tuple(edge) for (caller, edge) in callers[function].items()},
+            )
+            for function in calls
+        }
+
+    def write_collapsed(self, path):
+        with open(path, 'w') as collapsed_file:
+            for ((group, stack), seconds) in sorted(self.samples.items()):
+                microseconds = int(round(seconds * 1e6))
+                if microseconds > 0:
+                    collapsed_file.write(';'.join([group] + [_frame_label(function) for function in stack]) + f' {microseconds}\n')
+
+    def write_pstats(self, path, group = None):
+        """ The file can be read with pstats.Stats(<path>) or snakeviz """
+        with open(path, 'wb') as pstats_file:
+            marshal.dump(self.get_pstats(group), pstats_file)
+
+    def write_summary(self, path):
+        duration = (self.stop_time or time.time()) - self.start_time
+        weight = 'CPU' if self.uses_cpu_time else 'wall clock'
+        with open(path, 'w') as summary_file:
+            summary_file.write(f'Profiled for {duration:.1f} seconds, samples are weighted by the {weight} time\n\n')
+            for (group, seconds) in sorted(self.get_thread_times().items(), key = lambda item: -item[1]):
+                summary_file.write(f'{group:<24} {seconds:10.3f}s {100 * seconds / duration:6.1f}%\n')
+
+    def write(self, prefix) -> list:
+        """ Write every output file, returns their paths """
+        paths = [f'{prefix}.collapsed', f'{prefix}.pstats', f'{prefix}.summary.txt']
+        self.write_collapsed(paths[0])
+        self.write_pstats(paths[1])
+        self.write_summary(paths[2])
+
+        for group in sorted(self.get_thread_times()):
+            paths.append(f'{prefix}.{group}.pstats')
+            self.write_pstats(paths[-1], group)
+        return paths
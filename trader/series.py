@@ -0,0 +1,199 @@
+"""
+    Full series versions of the trader.indicators functions.
+
+    Every get_*_series function takes an array of close prices and returns an
+    array of the same length, where the value at index i is what the
+    trader.indicators function returns for the window that ends at index i.
+    The first <data_count> - 1 values have no complete window and are NaN.
+
+    The get_*_forming_series functions evaluate the indicator the way the bot
+    sees it live: <data_count> - 1 closed candles of a longer interval followed
+    by the forming candle, whose close is the current price.
+"""
+from typing import Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Number of windows evaluated at once, bounds the temporary memory
+CHUNK_SIZE = 1 << 16
+
+
+def _geometric_weights(alpha, count) -> np.ndarray:
+    """ [(1 - alpha)^(count - 1), ..., (1 - alpha), 1] """
+    return (1 - alpha) ** np.arange(count - 1, -1, -1)
+
+
+def _sma_of_windows(windows) -> np.ndarray:
+    return windows.mean(axis = 1)
+
+
+def _ema_of_windows(windows) -> np.ndarray:
+    # get_ema seeds with the average of the window and smooths every point after the first
+    data_count = windows.shape[1]
+    alpha = 2 / (data_count + 1)
+    weights = alpha * _geometric_weights(alpha, data_count)
+    weights[0] = 0.0
+    return (1 - alpha) ** (data_count - 1) * windows.mean(axis = 1) + windows @ weights
+
+
+def _rsi_of_windows(windows, moving_average) -> np.ndarray:
+    data_count = windows.shape[1]
+    if data_count == 1:
+        return np.zeros(len(windows))
+
+    diff = np.diff(windows, axis = 1)
+    change_up = np.where(diff > 0, diff, 0.0)
+    change_down = np.where(diff > 0, 0.0, -diff)
+
+    up_avg = change_up.mean(axis = 1)
+    down_avg = change_down.mean(axis = 1)
+
+    if moving_average == 1:
+        alpha = 2 / (data_count + 1)
+        weights = alpha * _geometric_weights(alpha, data_count - 1)
+        oldest_weight = (1 - alpha) ** (data_count - 1)
+        up_avg = oldest_weight * up_avg + change_up @ weights
+        down_avg = oldest_weight * down_avg + change_down @ weights
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        rsi = 100 - (100 / (1 + up_avg / down_avg))
+    rsi[down_avg == 0] = 100
+    return rsi
+
+
+def _bollinger_bands_of_windows(windows) -> np.ndarray:
+    middle = windows.mean(axis = 1)
+    deviation = windows.std(axis = 1)
+    return np.stack((middle + (2 * deviation), middle, middle - (2 * deviation)), axis = 1)
+
+
+def _validate(data_count, moving_average = 0):
+    if data_count <= 0:
+        raise Exception(f'data_count must be a positive integer, it was {data_count}')
+
+    if moving_average not in (0, 1):
+        raise Exception(f'<{moving_average}> is not valid for moving average parameter')
+
+
+def _series(kernel, data_points, data_count, width = None) -> np.ndarray:
+    """ Apply <kernel> to every complete window of <data_points> """
+    data_points = np.asarray(data_points, dtype = np.float64)
+    shape = (len(data_points),) if width is None else (len(data_points), width)
+    result = np.full(shape, np.nan)
+
+    if len(data_points) < data_count:
+        return result
+
+    windows = sliding_window_view(data_points, data_count)
+    for start in range(0, len(windows), CHUNK_SIZE):
+        chunk = windows[start:start + CHUNK_SIZE]
+        result[data_count - 1 + start:data_count - 1 + start + len(chunk)] = kernel(chunk)
+
+    return result
+
+
+def _forming_series(kernel, closes, data_count, forming_index, current_prices, width = None) -> np.ndarray:
+    """
+        Apply <kernel> to the window of every current price; the <data_count> - 1
+        closes before <forming_index> followed by the current price
+    """
+    closes = np.asarray(closes, dtype = np.float64)
+    forming_index = np.asarray(forming_index, dtype = np.int64)
+    current_prices = np.asarray(current_prices, dtype = np.float64)
+
+    shape = (len(current_prices),) if width is None else (len(current_prices), width)
+    result = np.full(shape, np.nan)
+
+    # Only the prices that have <data_count> - 1 closed candles before them
+    valid = np.flatnonzero((forming_index >= data_count - 1) & (forming_index <= len(closes)))
+    offsets = np.arange(-(data_count - 1), 0)
+
+    for start in range(0, len(valid), CHUNK_SIZE):
+        rows = valid[start:start + CHUNK_SIZE]
+        windows = np.empty((len(rows), data_count))
+        windows[:, :-1] = closes[forming_index[rows, None] + offsets]
+        windows[:, -1] = current_prices[rows]
+        result[rows] = kernel(windows)
+
+    return result
+
+
+def get_forming_index(open_times, interval_open_times) -> np.ndarray:
+    """
+        Returns the index of the <interval_open_times> candle
+        that is forming at each of the <open_times>
+    """
+    return np.searchsorted(np.asarray(interval_open_times), np.asarray(open_times), side = 'right') - 1
+
+
+def get_sma_series(data_points, data_count) -> np.ndarray:
+    """
+        Returns simple moving average series
+    """
+    _validate(data_count)
+    return _series(_sma_of_windows, data_points, data_count)
+
+
+def get_ema_series(data_points, data_count) -> np.ndarray:
+    """
+        Returns exponential moving average series
+    """
+    _validate(data_count)
+    return _series(_ema_of_windows, data_points, data_count)
+
+
+def get_rsi_series(data_points, data_count, moving_average = 0) -> np.ndarray:
+    """
+        Returns Relative Strength Index series, <data_count> close points per value
+
+        moving_average
+            0 - SMA (Simple Moving Average)
+            1 - EMA (Exponential Moving Average)
+
+        Windows without any downward change are 100 where get_rsi divides by zero.
+    """
+    _validate(data_count, moving_average)
+    return _series(lambda windows: _rsi_of_windows(windows, moving_average), data_points, data_count)
+
+
+def get_bollinger_bands_series(data_points, data_count) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Returns (upper, middle, lower) bollinger band series
+    """
+    _validate(data_count)
+    bands = _series(_bollinger_bands_of_windows, data_points, data_count, 3)
+    return (bands[:, 0], bands[:, 1], bands[:, 2])
+
+
+def get_sma_forming_series(closes, data_count, forming_index, current_prices) -> np.ndarray:
+    """
+        Returns simple moving average of each current price
+    """
+    _validate(data_count)
+    return _forming_series(_sma_of_windows, closes, data_count, forming_index, current_prices)
+
+
+def get_ema_forming_series(closes, data_count, forming_index, current_prices) -> np.ndarray:
+    """
+        Returns exponential moving average of each current price
+    """
+    _validate(data_count)
+    return _forming_series(_ema_of_windows, closes, data_count, forming_index, current_prices)
+
+
+def get_rsi_forming_series(closes, data_count, forming_index, current_prices, moving_average = 0) -> np.ndarray:
+    """
+        Returns Relative Strength Index of each current price
+    """
+    _validate(data_count, moving_average)
+    return _forming_series(lambda windows: _rsi_of_windows(windows, moving_average), closes, data_count, forming_index, current_prices)
+
+
+def get_bollinger_bands_forming_series(closes, data_count, forming_index, current_prices) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+        Returns (upper, middle, lower) bollinger bands of each current price
+    """
+    _validate(data_count)
+    bands = _forming_series(_bollinger_bands_of_windows, closes, data_count, forming_index, current_prices, 3)
+    return (bands[:, 0], bands[:, 1], bands[:, 2])
@@ -0,0 +1,215 @@
+"""
+    Backtesting engine for the signal spot bot rules.
+
+    The indicator values are precomputed arrays aligned with the price array,
+    the signals are evaluated for the whole timeline at once and only the
+    candles where an order can be created are visited.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import trader.series
+import trader.ssb.constants
+import trader.ssb.signals
+
+# Number of close points per indicator value, the same windows
+# that trader.binance.indicators reads in perform_bot_operations
+RSI_DATA_COUNT = 16
+BOLLINGER_DATA_COUNT = 21
+SMA_DATA_COUNT = 10
+EMA_DATA_COUNT = 10
+
+# Candles scanned at once while looking for a profitable sell
+SCAN_BLOCK_SIZE = 1024
+
+
+@dataclass
+class Fill:
+    index: int
+    side: str
+    price: float
+    quantity: float
+    quote_quantity: float
+
+
+@dataclass
+class BacktestResult:
+    initial_balance: float
+    final_balance: float
+    profit: float
+    profit_percent: float
+    max_drawdown_percent: float
+    buy_count: int
+    sell_count: int
+    fills: list = field(default_factory = list)
+    equity: np.ndarray = None
+
+
+def get_indicator_arrays(open_times, prices, klines_4h, klines_1d) -> dict:
+    """
+        Returns the indicators of perform_bot_operations for every price.
+
+        <open_times> and <prices> are the timeline to replay, e.g. 1m candles,
+        <klines_4h> and <klines_1d> are (open_times, closes) arrays. At every
+        step, the forming 4h and 1d candles close at the current price like
+        they do in the live bot.
+    """
+    (open_times_4h, closes_4h) = klines_4h
+    (open_times_1d, closes_1d) = klines_1d
+
+    forming_4h = trader.series.get_forming_index(open_times, open_times_4h)
+    forming_1d = trader.series.get_forming_index(open_times, open_times_1d)
+
+    (upper, _, lower) = trader.series.get_bollinger_bands_forming_series(closes_4h, BOLLINGER_DATA_COUNT, forming_4h, prices)
+
+    return {
+        'rsi': trader.series.get_rsi_forming_series(closes_4h, RSI_DATA_COUNT, forming_4h, prices),
+        'upper': upper,
+        'lower': lower,
+        'sma': trader.series.get_sma_forming_series(closes_4h, SMA_DATA_COUNT, forming_4h, prices),
+        'ema_4h': trader.series.get_ema_forming_series(closes_4h, EMA_DATA_COUNT, forming_4h, prices),
+        'ema_1d': trader.series.get_ema_forming_series(closes_1d, EMA_DATA_COUNT, forming_1d, prices),
+    }
+
+
+def _first_at_least(values, candidates, start, threshold) -> int:
+    """
+        Returns the position of the first candidate from <start> on whose value
+        is at least <threshold>, or -1. The candidates are scanned in growing
+        blocks so the cost stays proportional to the distance.
+    """
+    block_size = SCAN_BLOCK_SIZE
+    while start < len(candidates):
+        block = candidates[start:start + block_size]
+        matches = np.flatnonzero(values[block] >= threshold)
+        if len(matches) > 0:
+            return start + int(matches[0])
+        start += len(block)
+        block_size *= 2
+
+    return -1
+
+
+def get_signal_arrays(prices, indicators):
+    """
+        Returns (buy_signal, sell_signal) arrays for <prices>, <indicators> is a
+        dict of arrays aligned with <prices> with the keys of get_indicator_arrays
+    """
+    return trader.ssb.signals.count_signals(
+        np.asarray(prices, dtype = np.float64),
+        indicators['rsi'],
+        indicators['upper'],
+        indicators['lower'],
+        indicators['sma'],
+        indicators['ema_4h'],
+        indicators['ema_1d'],
+    )
+
+
+def run_backtest(prices, indicators, **kwargs) -> BacktestResult:
+    """
+        Replay the rules of perform_bot_operations over <prices>,
+        see run_backtest_on_signals for the keyword arguments
+    """
+    (buy_signal, sell_signal) = get_signal_arrays(prices, indicators)
+    return run_backtest_on_signals(prices, buy_signal, sell_signal, **kwargs)
+
+
+def run_backtest_on_signals(
+    prices,
+    buy_signal,
+    sell_signal,
+    trade_amount_buy = 15.0,
+    trade_wealth_percent_sell = 100.0,
+    prevent_loss = True,
+    initial_balance = 100.0,
+    buy_signal_percent = trader.ssb.constants.BUY_SIGNAL_PERCENT,
+    sell_signal_percent = trader.ssb.constants.SELL_SIGNAL_PERCENT,
+    min_profit_percent = trader.ssb.constants.MIN_PROFIT_PERCENT,
+) -> BacktestResult:
+    """
+        Replay the rules of perform_bot_operations over <prices> with the
+        signal counts of get_signal_arrays. The bot starts with <initial_balance>
+        of the target currency and buys on the next trade, orders fill at the price.
+    """
+    prices = np.asarray(prices, dtype = np.float64)
+    buy_candidates = np.flatnonzero(trader.ssb.signals.is_buy_signal(buy_signal, buy_signal_percent))
+    sell_candidates = np.flatnonzero(trader.ssb.signals.is_sell_signal(sell_signal, sell_signal_percent))
+
+    quote_balance = float(initial_balance)
+    base_balance = 0.0
+    buy_on_next_trade = True
+    last_operation_price = 0.0
+    fills = []
+    index = 0
+
+    while True:
+        if buy_on_next_trade:
+            position = int(buy_candidates.searchsorted(index))
+            target_amount = min(trade_amount_buy, quote_balance)
+            if position == len(buy_candidates) or target_amount <= 0:
+                break
+
+            index = int(buy_candidates[position])
+            price = float(prices[index])
+            quantity = target_amount / price
+
+            quote_balance -= target_amount
+            base_balance += quantity
+            fills.append(Fill(index, 'BUY', price, quantity, target_amount))
+        else:
+            position = int(sell_candidates.searchsorted(index))
+            if prevent_loss:
+                min_sell_price = trader.ssb.signals.get_min_sell_price(last_operation_price, min_profit_percent)
+                position = _first_at_least(prices, sell_candidates, position, min_sell_price)
+            if position == -1 or position == len(sell_candidates):
+                break
+
+            index = int(sell_candidates[position])
+            price = float(prices[index])
+            quantity = base_balance * trade_wealth_percent_sell / 100
+            target_amount = quantity * price
+
+            base_balance -= quantity
+            quote_balance += target_amount
+            fills.append(Fill(index, 'SELL', price, quantity, target_amount))
+
+        buy_on_next_trade = not buy_on_next_trade
+        last_operation_price = price
+        # The next decision is taken on the following price
+        index += 1
+
+    equity = _get_equity(prices, fills, initial_balance)
+    final_balance = float(equity[-1]) if len(equity) > 0 else float(initial_balance)
+    peaks = np.maximum.accumulate(equity) if len(equity) > 0 else equity
+
+    return BacktestResult(
+        initial_balance = float(initial_balance),
+        final_balance = final_balance,
+        profit = final_balance - initial_balance,
+        profit_percent = 100 * (final_balance - initial_balance) / initial_balance,
+        max_drawdown_percent = float(np.max(100 * (peaks - equity) / peaks)) if len(equity) > 0 else 0.0,
+        buy_count = sum(1 for fill in fills if fill.side == 'BUY'),
+        sell_count = sum(1 for fill in fills if fill.side == 'SELL'),
+        fills = fills,
+        equity = equity,
+    )
+
+
+def _get_equity(prices, fills, initial_balance) -> np.ndarray:
+    """ Account value in the target currency after every price """
+    fill_indexes = np.array([fill.index for fill in fills], dtype = np.int64)
+    quote_balances = np.empty(len(fills) + 1)
+    base_balances = np.empty(len(fills) + 1)
+    quote_balances[0] = initial_balance
+    base_balances[0] = 0.0
+
+    for (position, fill) in enumerate(fills):
+        direction = 1 if fill.side == 'BUY' else -1
+        quote_balances[position + 1] = quote_balances[position] - direction * fill.quote_quantity
+        base_balances[position + 1] = base_balances[position] + direction * fill.quantity
+
+    # Balances after the last fill at or before each price
+    state = np.searchsorted(fill_indexes, np.arange(len(prices)), side = 'right')
+    return quote_balances[state] + base_balances[state] * prices
@@ -1,6 +1,8 @@
 LOG_FILE = 'log_signal_spot_bot.txt'
 ERROR_LOG_FILE = 'error_log_signal_spot_bot.txt'
 CONFIG_FILE = 'config_signal_spot_bot.json'
+# buy_on_next_trade and last_operation_price of every symbol, see trader.ssb.state_store
+STATE_FILE = 'state_signal_spot_bot.db'
 EXPECTED_CONFIG_KEYS = {
     'enabled': bool,
     'base_currency': str,
@@ -10,4 +12,17 @@ EXPECTED_CONFIG_KEYS = {
     'trade_wealth_percent_sell': float,
     'last_operation_price': float,
     'prevent_loss': bool,
-}
\ No newline at end of file
+}
+
+# If prevent_loss is enabled,
+# make sure the profit is at least <MIN_PROFIT_PERCENT>
+MIN_PROFIT_PERCENT = 6
+
+BUY_SIGNAL_PERCENT = 100
+SELL_SIGNAL_PERCENT = 80
+
+# Number of indicators that vote for a buy or a sell signal
+TOTAL_INDICATOR_COUNT = 5
+
+# RSI votes for a sell above 70 - <RSI_MARGIN> and for a buy below 30 + <RSI_MARGIN>
+RSI_MARGIN = 4.0
@@ -0,0 +1,53 @@
+"""
+    Signal rules of the signal spot bot.
+
+    The functions only use comparisons and arithmetic, so they take
+    scalars as well as numpy arrays of indicator values.
+"""
+from typing import Tuple
+
+import trader.ssb.constants
+
+# RSI levels of the buy and sell votes, before the <RSI_MARGIN>
+RSI_OVERSOLD = 30
+RSI_OVERBOUGHT = 70
+
+
+def _count(condition):
+    """ Turn a bool (or an array of bools) into 0/1 """
+    return condition * 1
+
+
+def count_signals(current_price, rsi, upper, lower, sma, ema_4h, ema_1d) -> Tuple[int, int]:
+    """
+        Returns (buy_signal, sell_signal), the number of indicators
+        that are in favor of buying and selling at <current_price>
+    """
+    rsi_margin = trader.ssb.constants.RSI_MARGIN
+
+    buy_signal = _count(rsi <= RSI_OVERSOLD + rsi_margin) \
+        + _count(current_price < lower) \
+        + _count(current_price < sma) \
+        + _count(current_price < ema_4h) \
+        + _count(current_price < ema_1d)
+
+    sell_signal = _count(rsi >= RSI_OVERBOUGHT - rsi_margin) \
+        + _count(current_price > upper) \
+        + _count(current_price > sma) \
+        + _count(current_price > ema_4h) \
+        + _count(current_price > ema_1d)
+
+    return (buy_signal, sell_signal)
+
+
+def is_buy_signal(buy_signal, buy_signal_percent = trader.ssb.constants.BUY_SIGNAL_PERCENT):
+    return 100 * buy_signal / trader.ssb.constants.TOTAL_INDICATOR_COUNT >= buy_signal_percent
+
+
+def is_sell_signal(sell_signal, sell_signal_percent = trader.ssb.constants.SELL_SIGNAL_PERCENT):
+    return 100 * sell_signal / trader.ssb.constants.TOTAL_INDICATOR_COUNT >= sell_signal_percent
+
+
+def get_min_sell_price(last_operation_price, min_profit_percent = trader.ssb.constants.MIN_PROFIT_PERCENT) -> float:
+    """ The lowest price to sell at when prevent_loss is enabled """
+    return last_operation_price + (last_operation_price * min_profit_percent / 100)
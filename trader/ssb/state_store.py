@@ -0,0 +1,173 @@
+"""
+    Per symbol trade state of the signal spot bot.
+
+    buy_on_next_trade and last_operation_price change on every trade, they
+    are kept in an SQLite database in WAL mode, a row per symbol, instead of
+    rewriting the whole config file. A trade updates a single row in its own
+    transaction, so a crash leaves either the previous or the new state and
+    the workers never rewrite each other's symbols. The config file stays the
+    static input of the bot.
+
+    The same database holds the append-only trade ledger, next to the human
+    readable log, and the id of the latest buy of every symbol, so the profit
+    of a sell is a primary key lookup instead of a scan of the log file. A
+    trade and the state it leads to are written in the same transaction.
+"""
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+# Seconds a write waits for another process that holds the database
+BUSY_TIMEOUT = 30
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS symbol_state (
+        symbol TEXT PRIMARY KEY,
+        buy_on_next_trade INTEGER NOT NULL,
+        last_operation_price REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        side TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        quote_quantity REAL NOT NULL,
+        price REAL NOT NULL,
+        timestamp REAL NOT NULL,
+        order_id INTEGER
+    );
+
+    CREATE INDEX IF NOT EXISTS trades_by_symbol ON trades (symbol, id);
+
+    CREATE TABLE IF NOT EXISTS last_buys (
+        symbol TEXT PRIMARY KEY,
+        trade_id INTEGER NOT NULL REFERENCES trades (id)
+    );
+'''
+
+TRADE_COLUMNS = ('id', 'symbol', 'side', 'quantity', 'quote_quantity', 'price', 'timestamp', 'order_id')
+SELECT_TRADES = 'SELECT ' + ', '.join('trades.' + column for column in TRADE_COLUMNS) + ' FROM trades'
+
+
+def _row_to_trade(row) -> dict:
+    return dict(zip(TRADE_COLUMNS, row))
+
+
+def _row_to_state(row) -> dict:
+    return {
+        'buy_on_next_trade': bool(row[0]),
+        'last_operation_price': float(row[1]),
+    }
+
+
+class StateStore:
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout = BUSY_TIMEOUT, check_same_thread = False)
+        self._lock = threading.Lock()
+
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            # Every committed trade is on the disk before the next request
+            self._connection.execute('PRAGMA synchronous=FULL')
+            with self._connection:
+                self._connection.executescript(SCHEMA)
+
+    def get(self, symbol) -> Optional[dict]:
+        """ Returns {'buy_on_next_trade', 'last_operation_price'} of <symbol>, None if it never traded """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT buy_on_next_trade, last_operation_price FROM symbol_state WHERE symbol = ?',
+                (symbol,)
+            ).fetchone()
+
+        return _row_to_state(row) if row is not None else None
+
+    def get_all(self) -> dict:
+        """ Returns symbol -> state of every stored symbol """
+        with self._lock:
+            rows = self._connection.execute('SELECT symbol, buy_on_next_trade, last_operation_price FROM symbol_state').fetchall()
+
+        return {row[0]: _row_to_state(row[1:]) for row in rows}
+
+    def save(self, symbol, buy_on_next_trade, last_operation_price):
+        """ Replace the state of <symbol> atomically """
+        with self._lock, self._connection:
+            self._save(symbol, buy_on_next_trade, last_operation_price)
+
+    def add_trade(self, symbol, side, quantity, quote_quantity, price, order_id = None, timestamp = None) -> int:
+        """ Append a filled order to the ledger, returns its id """
+        with self._lock, self._connection:
+            return self._add_trade(symbol, side, quantity, quote_quantity, price, order_id, timestamp)
+
+    def record_trade(self, symbol, state, trade) -> int:
+        """
+            Save <state> {'buy_on_next_trade', 'last_operation_price'} of <symbol>
+            and append <trade> {'side', 'quantity', 'quote_quantity', 'price',
+            'order_id', 'timestamp'} in a single transaction, returns the trade id.
+            order_id and timestamp are optional.
+        """
+        with self._lock, self._connection:
+            self._save(symbol, state['buy_on_next_trade'], state['last_operation_price'])
+            return self._add_trade(
+                symbol,
+                trade['side'],
+                trade['quantity'],
+                trade['quote_quantity'],
+                trade['price'],
+                trade.get('order_id'),
+                trade.get('timestamp')
+            )
+
+    def _save(self, symbol, buy_on_next_trade, last_operation_price):
+        """ The caller holds the lock and the transaction """
+        self._connection.execute(
+            'INSERT OR REPLACE INTO symbol_state (symbol, buy_on_next_trade, last_operation_price, updated_at) VALUES (?, ?, ?, ?)',
+            (symbol, int(bool(buy_on_next_trade)), float(last_operation_price), time.time())
+        )
+
+    def _add_trade(self, symbol, side, quantity, quote_quantity, price, order_id, timestamp) -> int:
+        """ The caller holds the lock and the transaction """
+        if side not in ('BUY', 'SELL'):
+            raise Exception(f'<{side}> is not a valid side, it must be BUY or SELL')
+
+        timestamp = timestamp if timestamp is not None else time.time()
+        order_id = int(order_id) if order_id is not None else None
+
+        trade_id = self._connection.execute(
+            'INSERT INTO trades (symbol, side, quantity, quote_quantity, price, timestamp, order_id) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (symbol, side, float(quantity), float(quote_quantity), float(price), timestamp, order_id)
+        ).lastrowid
+
+        if side == 'BUY':
+            self._connection.execute('INSERT OR REPLACE INTO last_buys (symbol, trade_id) VALUES (?, ?)', (symbol, trade_id))
+
+        return trade_id
+
+    def get_last_buy(self, symbol) -> Optional[dict]:
+        """ Returns the latest BUY trade of <symbol>, None if the ledger has none """
+        with self._lock:
+            row = self._connection.execute(
+                SELECT_TRADES + ' JOIN last_buys ON trades.id = last_buys.trade_id WHERE last_buys.symbol = ?',
+                (symbol,)
+            ).fetchone()
+
+        return _row_to_trade(row) if row is not None else None
+
+    def get_trades(self, symbol = None) -> list:
+        """ Returns every trade, or the trades of <symbol>, oldest first """
+        with self._lock:
+            if symbol is None:
+                rows = self._connection.execute(SELECT_TRADES + ' ORDER BY trades.id').fetchall()
+            else:
+                rows = self._connection.execute(SELECT_TRADES + ' WHERE trades.symbol = ? ORDER BY trades.id', (symbol,)).fetchall()
+
+        return [_row_to_trade(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
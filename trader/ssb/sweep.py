@@ -0,0 +1,173 @@
+"""
+    Parallel parameter sweep over the signal spot bot backtests.
+
+    The indicator series of a (symbol, interval) pair and the signal counts
+    derived from them don't depend on the swept parameters, so they are
+    computed once, placed into shared memory and read by every worker
+    process without being copied or pickled.
+"""
+import concurrent.futures
+import heapq
+import itertools
+import json
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import trader.ssb.backtest
+
+# Row order of the arrays in a shared memory block
+SERIES_KEYS = ['prices', 'buy_signal', 'sell_signal']
+
+# Parameter combinations run by a worker per task
+DEFAULT_TASK_SIZE = 64
+
+# Number of best results kept in the ranked file
+DEFAULT_TOP_COUNT = 100
+
+DEFAULT_GRID = {
+    'buy_signal_percent': [40, 60, 80, 100],
+    'sell_signal_percent': [40, 60, 80, 100],
+    'prevent_loss': [True, False],
+    'min_profit_percent': [1, 2, 4, 6, 8, 10],
+    'trade_wealth_percent_sell': [100.0],
+}
+
+
+def get_parameter_combinations(grid) -> list:
+    """ Returns every combination of the <grid> values as a list of dicts """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+class SharedSeries:
+    """
+        The prices and signal counts of a (symbol, interval) pair
+        in a single shared memory block
+    """
+
+    def __init__(self, symbol, interval, prices, indicators):
+        self.symbol = symbol
+        self.interval = interval
+        self.length = len(prices)
+
+        (buy_signal, sell_signal) = trader.ssb.backtest.get_signal_arrays(prices, indicators)
+        rows = [prices, buy_signal, sell_signal]
+        self.memory = shared_memory.SharedMemory(create = True, size = max(1, len(SERIES_KEYS) * self.length * 8))
+        array = np.ndarray((len(SERIES_KEYS), self.length), dtype = np.float64, buffer = self.memory.buf)
+        for (index, row) in enumerate(rows):
+            array[index] = np.asarray(row, dtype = np.float64)
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+# Shared memory blocks attached by a worker process, name -> (SharedMemory, arrays)
+_attached = {}
+
+
+def _attach(name, length) -> dict:
+    if name not in _attached:
+        memory = shared_memory.SharedMemory(name = name)
+        array = np.ndarray((len(SERIES_KEYS), length), dtype = np.float64, buffer = memory.buf)
+        _attached[name] = (memory, {key: array[index] for (index, key) in enumerate(SERIES_KEYS)})
+
+    return _attached[name][1]
+
+
+def _run_task(symbol, interval, name, length, combinations, backtest_options) -> list:
+    arrays = _attach(name, length)
+    results = []
+
+    for parameters in combinations:
+        result = trader.ssb.backtest.run_backtest_on_signals(
+            arrays['prices'],
+            arrays['buy_signal'],
+            arrays['sell_signal'],
+            **backtest_options,
+            **parameters
+        )
+        results.append({
+            'symbol': symbol,
+            'interval': interval,
+            'parameters': parameters,
+            'profit_percent': result.profit_percent,
+            'max_drawdown_percent': result.max_drawdown_percent,
+            'buy_count': result.buy_count,
+            'sell_count': result.sell_count,
+        })
+
+    return results
+
+
+def _write_ranked(file_name, ranked):
+    """ Replace the ranked file atomically """
+    temp_file_name = f'{file_name}.tmp'
+    with open(temp_file_name, 'w') as ranked_file:
+        ranked_file.write(json.dumps(sorted(ranked, key = lambda result: result['profit_percent'], reverse = True), indent = 4))
+    os.replace(temp_file_name, file_name)
+
+
+def run_sweep(
+    series,
+    grid = DEFAULT_GRID,
+    output_file = 'sweep_results.jsonl',
+    ranked_file = 'sweep_ranked.json',
+    workers = None,
+    task_size = DEFAULT_TASK_SIZE,
+    top_count = DEFAULT_TOP_COUNT,
+    backtest_options = None,
+) -> list:
+    """
+        Run every <grid> combination on every (symbol, interval, prices, indicators)
+        tuple in <series> over <workers> processes (all cores by default).
+
+        Each result is appended to <output_file> as soon as it arrives and the
+        best <top_count> results are kept up to date in <ranked_file>.
+        Returns the ranked results.
+    """
+    if backtest_options is None:
+        backtest_options = {}
+
+    combinations = get_parameter_combinations(grid)
+    shared = []
+    ranked = []
+
+    try:
+        for (symbol, interval, prices, indicators) in series:
+            shared.append(SharedSeries(symbol, interval, prices, indicators))
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor, open(output_file, 'a') as output:
+            futures = []
+            for shared_series in shared:
+                for start in range(0, len(combinations), task_size):
+                    futures.append(executor.submit(
+                        _run_task,
+                        shared_series.symbol,
+                        shared_series.interval,
+                        shared_series.name,
+                        shared_series.length,
+                        combinations[start:start + task_size],
+                        backtest_options,
+                    ))
+
+            for future in concurrent.futures.as_completed(futures):
+                results = future.result()
+                for result in results:
+                    output.write(json.dumps(result) + '\n')
+                    heapq.heappush(ranked, (result['profit_percent'], id(result), result))
+                    if len(ranked) > top_count:
+                        heapq.heappop(ranked)
+                output.flush()
+                _write_ranked(ranked_file, [entry[2] for entry in ranked])
+    finally:
+        for shared_series in shared:
+            shared_series.close()
+
+    return sorted((entry[2] for entry in ranked), key = lambda result: result['profit_percent'], reverse = True)
@@ -0,0 +1,248 @@
+"""
+    Price trigger index of the signal spot bot.
+
+    Between two candle closes every indicator of perform_bot_operations moves
+    with the forming close only, and each signal rule flips at a single price;
+    below the SMA or above the upper Bollinger band, an RSI level, etc. The
+    index keeps these prices of every symbol sorted with the signal counts of
+    the bands between them, so a price update is a bisect instead of reading
+    the indicators. A symbol is evaluated again when its price comes close to
+    a band edge, a candle closes or its trade state changes.
+"""
+import bisect
+import threading
+from typing import Optional, Tuple
+
+import trader.binance.klines
+import trader.ssb.constants
+import trader.ssb.signals
+
+# Number of close points per indicator value, the same windows
+# that trader.binance.indicators reads in perform_bot_operations
+RSI_DATA_COUNT = 16
+BOLLINGER_DATA_COUNT = 21
+SMA_DATA_COUNT = 10
+EMA_DATA_COUNT = 10
+
+# Deviations between the middle and the outer bollinger bands
+BOLLINGER_DEVIATIONS = 2
+
+# Prices this close to an edge, relative to it, are evaluated in full;
+# the indicators and the edges are rounded differently
+TRIGGER_PRICE_MARGIN = 1e-9
+
+
+def get_sma_trigger(closed) -> float:
+    """ The forming close is below the SMA of the window below this price """
+    return sum(closed) / len(closed)
+
+
+def get_ema_trigger(closed) -> float:
+    """
+        The forming close is below the EMA of the window below this price.
+
+        The EMA is c + w * <forming close>, it is solved for c + w * p = p.
+    """
+    count = len(closed) + 1
+    alpha = 2 / (count + 1)
+    ratio = 1 - alpha
+    oldest_weight = ratio ** (count - 1)
+
+    weighted_total = 0.0
+    for data_point in closed[1:]:
+        weighted_total = ratio * weighted_total + data_point
+
+    constant = oldest_weight * sum(closed) / count + alpha * ratio * weighted_total
+    weight = oldest_weight / count + alpha
+    return constant / (1 - weight)
+
+
+def get_bollinger_triggers(closed, deviations = BOLLINGER_DEVIATIONS) -> Tuple[float, float]:
+    """
+        Returns (upper, lower), the forming close is above the upper band of
+        the window above <upper> and below its lower band below <lower>.
+
+        The z-score of the forming close grows with it, it is <deviations> at
+        mean(closed) +- deviations * sqrt(Q * n / ((n - 1) * (n - 1 - deviations^2)))
+        where Q is the squared distance of the closed points to their mean.
+    """
+    count = len(closed) + 1
+    mean = sum(closed) / len(closed)
+    squared_total = sum((data_point - mean) ** 2 for data_point in closed)
+
+    distance = deviations * (squared_total * count / ((count - 1) * (count - 1 - deviations ** 2))) ** (1 / 2)
+    return (mean + distance, mean - distance)
+
+
+def get_rsi_trigger(closed, level, moving_average = 0) -> float:
+    """
+        The RSI of the window is at least <level> from this forming close on.
+
+        The average up and down changes are U + w * up and D + w * down of the
+        last change, RSI >= level where (1 - r) * (U + w * up) >= r * (D + w * down)
+        with r = level / 100.
+    """
+    count = len(closed)
+    changes = [closed[index] - closed[index - 1] for index in range(1, count)]
+    ups = [max(change, 0.0) for change in changes]
+    downs = [max(-change, 0.0) for change in changes]
+
+    if moving_average == 0:
+        up_average = sum(ups) / count
+        down_average = sum(downs) / count
+        weight = 1 / count
+    elif moving_average == 1:
+        alpha = 2 / (count + 2)
+        ratio = 1 - alpha
+        oldest_weight = ratio ** count
+        weighted_up = 0.0
+        weighted_down = 0.0
+        for (up, down) in zip(ups, downs):
+            weighted_up = ratio * weighted_up + up
+            weighted_down = ratio * weighted_down + down
+        up_average = oldest_weight * sum(ups) / count + alpha * ratio * weighted_up
+        down_average = oldest_weight * sum(downs) / count + alpha * ratio * weighted_down
+        weight = oldest_weight / count + alpha
+    else:
+        raise Exception(f'<{moving_average}> is not valid for moving average parameter')
+
+    ratio = level / 100
+    balance = ratio * down_average - (1 - ratio) * up_average
+    if balance >= 0:
+        change = balance / ((1 - ratio) * weight)
+    else:
+        change = balance / (ratio * weight)
+    return closed[-1] + change
+
+
+class PriceBands:
+    """
+        The sorted prices where the signal counts of a symbol change and the
+        (buy_signal, sell_signal) of the <len(edges) + 1> bands between them
+    """
+
+    def __init__(self, key, edges, signals, margin = TRIGGER_PRICE_MARGIN):
+        self.key = key
+        self.edges = edges
+        self.signals = signals
+        self.margin = margin
+
+    @classmethod
+    def from_conditions(cls, key, conditions, margin = TRIGGER_PRICE_MARGIN):
+        """
+            <conditions> are (price, side, is_below) tuples, the rule counts for
+            <side> ('BUY', 'SELL' or None) below or above <price>
+        """
+        conditions = sorted(conditions, key = lambda condition: condition[0])
+
+        buy_signal = sum(1 for (_, side, is_below) in conditions if side == 'BUY' and is_below)
+        sell_signal = sum(1 for (_, side, is_below) in conditions if side == 'SELL' and is_below)
+        signals = [(buy_signal, sell_signal)]
+
+        for (_, side, is_below) in conditions:
+            change = -1 if is_below else 1
+            if side == 'BUY':
+                buy_signal += change
+            elif side == 'SELL':
+                sell_signal += change
+            signals.append((buy_signal, sell_signal))
+
+        return cls(key, [condition[0] for condition in conditions], signals, margin)
+
+    def get_signals(self, price) -> Optional[Tuple[int, int]]:
+        """ Returns (buy_signal, sell_signal) at <price>, None next to an edge """
+        index = bisect.bisect(self.edges, price)
+
+        if index < len(self.edges) and self.edges[index] - price <= self.margin * abs(self.edges[index]):
+            return None
+        if index > 0 and price - self.edges[index - 1] <= self.margin * abs(self.edges[index - 1]):
+            return None
+
+        return self.signals[index]
+
+
+def get_price_bands(key, closes_4h, closes_1d, min_sell_price = None, rsi_moving_average = 0) -> PriceBands:
+    """
+        Returns the bands of the indicators of perform_bot_operations, <closes_4h>
+        and <closes_1d> end with the forming candle. <min_sell_price> is the
+        prevent_loss threshold, an edge without any signal count change.
+    """
+    rsi_closed = closes_4h[-RSI_DATA_COUNT:-1]
+    (upper, lower) = get_bollinger_triggers(closes_4h[-BOLLINGER_DATA_COUNT:-1])
+    sma = get_sma_trigger(closes_4h[-SMA_DATA_COUNT:-1])
+    ema_4h = get_ema_trigger(closes_4h[-EMA_DATA_COUNT:-1])
+    ema_1d = get_ema_trigger(closes_1d[-EMA_DATA_COUNT:-1])
+
+    rsi_margin = trader.ssb.constants.RSI_MARGIN
+    conditions = [
+        (get_rsi_trigger(rsi_closed, trader.ssb.signals.RSI_OVERSOLD + rsi_margin, rsi_moving_average), 'BUY', True),
+        (lower, 'BUY', True),
+        (sma, 'BUY', True),
+        (ema_4h, 'BUY', True),
+        (ema_1d, 'BUY', True),
+        (get_rsi_trigger(rsi_closed, trader.ssb.signals.RSI_OVERBOUGHT - rsi_margin, rsi_moving_average), 'SELL', False),
+        (upper, 'SELL', False),
+        (sma, 'SELL', False),
+        (ema_4h, 'SELL', False),
+        (ema_1d, 'SELL', False),
+    ]
+
+    if min_sell_price is not None:
+        conditions.append((min_sell_price, None, False))
+
+    return PriceBands.from_conditions(key, conditions)
+
+
+class TriggerIndex:
+    """
+        Symbol -> PriceBands of the latest evaluation.
+
+        The bands are valid while the closed candles of the kline windows and
+        the trade state of the symbol stay the same, <key> tells them apart.
+    """
+
+    def __init__(self):
+        self._bands = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(symbol, buy_on_next_trade, last_operation_price, prevent_loss) -> tuple:
+        """ Also brings the windows up to date, a closed candle changes their version """
+        window_4h = trader.binance.klines.get_window(symbol, '4h', BOLLINGER_DATA_COUNT)
+        window_1d = trader.binance.klines.get_window(symbol, '1d', EMA_DATA_COUNT)
+        return (window_4h.version, window_1d.version, buy_on_next_trade, last_operation_price, prevent_loss)
+
+    def get_signals(self, symbol, price, key) -> Optional[Tuple[int, int]]:
+        """ Returns (buy_signal, sell_signal) or None if the symbol must be evaluated """
+        with self._lock:
+            bands = self._bands.get(symbol)
+
+        if bands is None or bands.key != key:
+            return None
+        return bands.get_signals(price)
+
+    def update(self, symbol, key, min_sell_price = None):
+        """ Rebuild the bands of <symbol> from its kline windows """
+        closes_4h = trader.binance.klines.get_closes(symbol, '4h', BOLLINGER_DATA_COUNT)
+        closes_1d = trader.binance.klines.get_closes(symbol, '1d', EMA_DATA_COUNT)
+
+        # A symbol listed recently has shorter windows, it is always evaluated
+        if len(closes_4h) < BOLLINGER_DATA_COUNT or len(closes_1d) < EMA_DATA_COUNT:
+            self.remove(symbol)
+            return
+
+        bands = get_price_bands(key, closes_4h, closes_1d, min_sell_price)
+        with self._lock:
+            self._bands[symbol] = bands
+
+    def remove(self, symbol):
+        with self._lock:
+            self._bands.pop(symbol, None)
+
+    def clear(self):
+        with self._lock:
+            self._bands.clear()
+
+
+# Shared by the workers of the bot
+trigger_index = TriggerIndex()
@@ -116,7 +116,7 @@ class TUI:
     program_log = ProgramLog()
 
     def nonblocking_draw(self):
-        thread = threading.Thread(target=self.draw)
+        thread = threading.Thread(target=self.draw, name="tui-draw")
         thread.daemon = True
         thread.start()
 